@@ -0,0 +1,189 @@
+import argparse
+import io
+import json
+import os
+import tempfile
+from contextlib import redirect_stdout
+import numpy as np
+import pandas as pd
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+import script_relacional
+import script_no_relacional
+import script_integracion
+import script_warehouse
+from instrumentacion import crear_reporte, medir_etapa, guardar_reporte, imprimir_reporte
+
+CONTINENTES = {
+    'africa': 'África',
+    'america': 'América',
+    'asia': 'Asia',
+    'europa': 'Europa'
+}
+CATEGORIAS_COSTOS = ['hospedaje', 'comida', 'transporte', 'entretenimiento']
+
+def nombres_paises(n):
+    return [f"Pais {i:08d}" for i in range(n)]
+
+def generar_pais_envejecimiento(ruta, n, rng):
+    df = pd.DataFrame({
+        'id_pais': np.arange(1, n + 1),
+        'nombre_pais': nombres_paises(n),
+        'capital': [f"Capital {i}" for i in range(n)],
+        'continente': rng.choice(list(CONTINENTES.values()), n),
+        'region': rng.choice(['Norte', 'Sur', 'Este', 'Oeste'], n),
+        'poblacion': rng.integers(100_000, 200_000_000, n).astype('float64'),
+        'tasa_de_envejecimiento': rng.uniform(3, 30, n).round(2)
+    })
+    # el archivo real tiene la mayoría de capital/continente/region/poblacion vacíos
+    for col in ['capital', 'continente', 'region', 'poblacion']:
+        df.loc[rng.random(n) < 0.9, col] = np.nan
+    df.to_csv(ruta, index=False)
+
+def generar_pais_poblacion(ruta, n, rng):
+    pd.DataFrame({
+        '_id': [f"{i:024x}" for i in range(n)],
+        'continente': rng.choice(list(CONTINENTES.values()), n),
+        'pais': nombres_paises(n),
+        'poblacion': rng.integers(100_000, 200_000_000, n),
+        'costo_bajo_hospedaje': rng.integers(5, 120, n),
+        'costo_promedio_comida': rng.integers(5, 80, n),
+        'costo_bajo_transporte': rng.integers(1, 40, n),
+        'costo_promedio_entretenimiento': rng.integers(5, 90, n)
+    }).to_csv(ruta, index=False)
+
+def generar_big_mac(ruta, n, rng):
+    precios = rng.uniform(1, 9, n).round(2)
+    continentes = rng.choice(list(CONTINENTES.values()), n)
+    documentos = [
+        {'país': pais, 'continente': continente, 'precio_big_mac_usd': float(precio)}
+        for pais, continente, precio in zip(nombres_paises(n), continentes, precios)
+    ]
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(documentos, f, ensure_ascii=False)
+
+def generar_costos_turisticos(directorio, n, rng):
+    nombres = nombres_paises(n)
+    bajos = rng.integers(5, 60, (n, len(CATEGORIAS_COSTOS)))
+    poblaciones = rng.integers(100_000, 200_000_000, n)
+    claves = list(CONTINENTES)
+    asignacion = rng.integers(0, len(claves), n)
+
+    for indice, clave in enumerate(claves):
+        documentos = []
+        for i in np.flatnonzero(asignacion == indice):
+            costos = {
+                categoria: {
+                    'precio_bajo_usd': int(bajos[i, j]),
+                    'precio_promedio_usd': int(bajos[i, j] * 1.5),
+                    'precio_alto_usd': int(bajos[i, j] * 2)
+                }
+                for j, categoria in enumerate(CATEGORIAS_COSTOS)
+            }
+            documentos.append({
+                'continente': CONTINENTES[clave],
+                'región': 'Región sintética',
+                'país': nombres[i],
+                'capital': f"Capital {i}",
+                'población': int(poblaciones[i]),
+                'costos_diarios_estimados_en_dólares': costos
+            })
+        with open(os.path.join(directorio, f"costos_turisticos_{clave}.json"), 'w', encoding='utf-8') as f:
+            json.dump(documentos, f, ensure_ascii=False)
+
+def generar_fuentes(directorio, n, semilla=0):
+    """Genera los cuatro tipos de archivo fuente con n países cada uno"""
+    rng = np.random.default_rng(semilla)
+    generar_pais_envejecimiento(os.path.join(directorio, 'pais_envejecimiento.csv'), n, rng)
+    generar_pais_poblacion(os.path.join(directorio, 'pais_poblacion.csv'), n, rng)
+    generar_big_mac(os.path.join(directorio, 'paises_mundo_big_mac.json'), n, rng)
+    generar_costos_turisticos(directorio, n, rng)
+
+def ejecutar_cadena(reporte, n, paralelo):
+    with medir_etapa(reporte, 'generar') as etapa:
+        generar_fuentes('.', n)
+        etapa['filas_salida'] = 4 * n
+
+    salida = io.StringIO()
+    with redirect_stdout(salida):
+        with medir_etapa(reporte, 'relacional', 2 * n) as etapa:
+            conn, cursor = script_relacional.crear_base_datos()
+            script_relacional.crear_tablas(conn, cursor)
+            script_relacional.cargar_datos(conn, cursor)
+            conn.close()
+            etapa['filas_salida'] = 2 * n
+
+        client = mongomock.MongoClient()
+        with medir_etapa(reporte, 'documental', 2 * n) as etapa:
+            script_no_relacional.cargar_colecciones(client, paralelo=paralelo)
+            etapa['filas_salida'] = sum(client['paisesDB'][nombre].count_documents({})
+                                        for nombre in script_no_relacional.COLECCIONES)
+
+        engine = script_integracion.conectar_sqlite()
+        with medir_etapa(reporte, 'extraer', 4 * n) as etapa:
+            df_envejecimiento, df_poblacion, df_big_mac, df_costos = script_integracion.extraer_fuentes(engine, client, paralelo)
+            etapa['filas_salida'] = sum(map(len, [df_envejecimiento, df_poblacion, df_big_mac, df_costos]))
+        engine.dispose()
+
+        with medir_etapa(reporte, 'preparar', etapa['filas_salida']) as etapa:
+            fuentes = script_integracion.preparar_dataframes(df_envejecimiento, df_poblacion, df_big_mac, df_costos)
+            etapa['filas_salida'] = sum(map(len, fuentes))
+
+        with medir_etapa(reporte, 'integrar', etapa['filas_salida']) as etapa:
+            df_integrado = script_integracion.integrar_datos(*fuentes)
+            etapa['filas_salida'] = len(df_integrado)
+
+        with medir_etapa(reporte, 'limpiar', len(df_integrado)) as etapa:
+            df_final = script_integracion.limpiar_datos_integrados(df_integrado)
+            etapa['filas_salida'] = len(df_final)
+
+        with medir_etapa(reporte, 'guardar', len(df_final)):
+            script_integracion.guardar_datos_integrados(df_final)
+
+        with medir_etapa(reporte, 'warehouse', len(df_final)) as etapa:
+            conn, cursor = script_warehouse.crear_datawarehouse()
+            script_warehouse.cargar_dimension_costos(cursor)
+            id_tiempo = script_warehouse.cargar_dimension_tiempo(cursor)
+            script_warehouse.cargar_datos_integrados(conn, cursor, id_tiempo)
+            script_warehouse.crear_indices(conn, cursor)
+            etapa['filas_salida'] = cursor.execute("SELECT COUNT(*) FROM fact_economicos").fetchone()[0]
+
+        with medir_etapa(reporte, 'analisis'):
+            script_warehouse.realizar_analisis(cursor)
+            conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sin conexión de toda la cadena ETL con datos sintéticos")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[1_000, 10_000, 100_000],
+                        help="Número de países por archivo fuente")
+    parser.add_argument('--secuencial', action='store_true', help="Ingesta de JSON y extracción de fuentes sin concurrencia")
+    parser.add_argument('--sin-memoria', action='store_true', help="No usa tracemalloc")
+    parser.add_argument('--reportes', default='reportes', help="Directorio donde se guardan los reportes JSON")
+    args = parser.parse_args()
+
+    if mongomock is None:
+        print("Se necesita mongomock para simular MongoDB: pip install mongomock")
+        return
+
+    directorio_reportes = os.path.abspath(args.reportes)
+    directorio_original = os.getcwd()
+
+    for n in args.tamanos:
+        print(f"\n=== {n:,} países ===")
+        reporte = crear_reporte(f"benchmark_etl_{n}", memoria=not args.sin_memoria)
+        with tempfile.TemporaryDirectory() as directorio:
+            os.chdir(directorio)
+            try:
+                ejecutar_cadena(reporte, n, not args.secuencial)
+            finally:
+                os.chdir(directorio_original)
+
+        imprimir_reporte(reporte)
+        print(f"Reporte guardado en: {guardar_reporte(reporte, directorio_reportes)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from script_integracion import expandir_costos_iterativo, expandir_costos_columnar
+
+CATEGORIAS = ['hospedaje', 'comida', 'transporte', 'entretenimiento']
+TIPOS = ['precio_bajo_usd', 'precio_promedio_usd', 'precio_alto_usd']
+
+def generar_costos(n, semilla=0):
+    rng = np.random.default_rng(semilla)
+    valores = rng.integers(1, 200, size=(n, len(CATEGORIAS) * len(TIPOS)))
+    claves = [f"{categoria}_{tipo}" for categoria in CATEGORIAS for tipo in TIPOS]
+
+    costos = [dict(zip(claves, fila.tolist())) for fila in valores]
+    return pd.DataFrame({
+        'pais': [f"pais_{i}" for i in range(n)],
+        'continente': 'Europa',
+        'costos': costos
+    })
+
+def medir(funcion, df):
+    inicio = time.perf_counter()
+    resultado = funcion(df.copy())
+    return time.perf_counter() - inicio, resultado
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark de la expansión de la columna 'costos'")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--limite-iterativo', type=int, default=100_000,
+                        help="Tamaño máximo para el que se mide el modo iterativo (es muy lento)")
+    args = parser.parse_args()
+
+    print("Benchmark de expansión de costos\n")
+    print(f"{'documentos':>12} {'iterativo (s)':>14} {'columnar (s)':>13} {'mejora':>8}")
+
+    for n in args.tamanos:
+        df = generar_costos(n)
+
+        t_columnar, df_columnar = medir(expandir_costos_columnar, df)
+
+        if n <= args.limite_iterativo:
+            t_iterativo, df_iterativo = medir(expandir_costos_iterativo, df)
+            pd.testing.assert_frame_equal(df_iterativo, df_columnar, check_dtype=False)
+            print(f"{n:>12,} {t_iterativo:>14.3f} {t_columnar:>13.3f} {t_iterativo / t_columnar:>7.1f}x")
+        else:
+            print(f"{n:>12,} {'-':>14} {t_columnar:>13.3f} {'-':>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+from script_warehouse import (
+    crear_datawarehouse, cargar_dimension_costos, cargar_dimension_tiempo, cargar_dataframe_integrado,
+    actualizar_agregados, calcular_hash, COLUMNAS_DIM_PAIS, COLUMNAS_COSTOS
+)
+
+def generar_datos_integrados(n, semilla=0):
+    rng = np.random.default_rng(semilla)
+    continentes = np.array(['África', 'América', 'Asia', 'Europa', 'Oceanía'])
+    df = pd.DataFrame({
+        'id_pais': np.arange(1, n + 1),
+        'pais': [f"pais_{i}" for i in range(n)],
+        'capital': [f"capital_{i}" for i in range(n)],
+        'continente': continentes[rng.integers(0, len(continentes), n)],
+        'poblacion': rng.integers(10_000, 1_000_000_000, n).astype('float64'),
+        'tasa_de_envejecimiento': rng.uniform(1, 35, n).round(2),
+        'precio_big_mac_usd': rng.uniform(1, 9, n).round(2),
+        'costo_bajo_hospedaje': rng.uniform(5, 120, n).round(2),
+        'costo_promedio_comida': rng.uniform(5, 80, n).round(2),
+        'costo_bajo_transporte': rng.uniform(1, 40, n).round(2),
+        'costo_promedio_entretenimiento': rng.uniform(5, 90, n).round(2),
+        'region_costos': 'Desconocido'
+    })
+    df.loc[rng.random(n) < 0.05, 'precio_big_mac_usd'] = np.nan
+    return df
+
+def tabla_dim_pais(df):
+    """Las columnas de dim_pais y su hash, calculados como en cargar_dimension_pais"""
+    df_dim = pd.DataFrame({
+        'id_pais_origen': df['id_pais'].astype('int64'),
+        'pais': df['pais'],
+        'capital': df['capital'],
+        'continente': df['continente'],
+        'region': df['region_costos'] if 'region_costos' in df.columns else 'Desconocido',
+        'poblacion': df['poblacion'],
+        'tasa_de_envejecimiento': df['tasa_de_envejecimiento']
+    })
+    df_dim['hash_fila'] = calcular_hash(df_dim[COLUMNAS_DIM_PAIS[1:]])
+    return df_dim
+
+def cargar_iterrows(conn, cursor, df, id_tiempo):
+    """Hace lo mismo que cargar_dataframe_integrado (SCD tipo 2, hashes de fila y de hecho, agregados)
+    pero con el recorrido de la versión original: iterrows y una consulta e inserción por fila.
+    Los hashes se calculan igual en ambos caminos para que solo se compare la forma de cargar"""
+    df = df.drop_duplicates(subset='id_pais')
+    dimension_vacia = cursor.execute("SELECT COUNT(*) FROM dim_pais").fetchone()[0] == 0
+    afectados = set()
+
+    for _, row in tabla_dim_pais(df).astype(object).iterrows():
+        origen = row['id_pais_origen']
+        vigente = cursor.execute(
+            "SELECT id_pais, hash_fila FROM dim_pais WHERE id_pais_origen = ? AND vigente = 1", (origen,)
+        ).fetchone()
+        if vigente is not None and vigente[1] == row['hash_fila']:
+            continue
+        if vigente is not None:
+            cursor.execute("UPDATE dim_pais SET vigente = 0, id_tiempo_hasta = ? WHERE id_pais = ?", (id_tiempo, vigente[0]))
+        cursor.execute(f'''
+        INSERT INTO dim_pais (id_pais, {', '.join(COLUMNAS_DIM_PAIS)}, hash_fila, id_tiempo_desde, vigente)
+        VALUES ({', '.join('?' for _ in COLUMNAS_DIM_PAIS)}, ?, ?, ?, 1)
+        ''', (origen if dimension_vacia else None, *(row[col] for col in COLUMNAS_DIM_PAIS), row['hash_fila'], id_tiempo))
+        afectados.add(origen)
+
+    cursor.execute("SELECT tipo_costo, id_costo FROM dim_costos")
+    ids_costo = dict(cursor.fetchall())
+    cursor.execute("SELECT id_pais_origen, id_pais FROM dim_pais WHERE vigente = 1")
+    mapa_pais = dict(cursor.fetchall())
+
+    hechos = []
+    for _, row in df.iterrows():
+        origen = int(row['id_pais'])
+        for columna, tipo in COLUMNAS_COSTOS.items():
+            if columna in row and pd.notna(row[columna]):
+                hechos.append((mapa_pais[origen], ids_costo[tipo], row[columna], origen))
+    df_hechos = pd.DataFrame(hechos, columns=['id_pais', 'id_costo', 'valor', 'id_pais_origen'])
+    hashes = calcular_hash(df_hechos[['id_pais', 'id_costo', 'valor']]).tolist()
+
+    for (id_pais, id_costo, valor, origen), hash_hecho in zip(hechos, hashes):
+        clave = f"{origen}:{id_costo}"
+        vigente = cursor.execute(
+            "SELECT hash_hecho FROM fact_economicos WHERE clave_hecho = ? AND vigente = 1", (clave,)
+        ).fetchone()
+        if vigente is not None and vigente[0] == hash_hecho:
+            continue
+        if vigente is not None:
+            cursor.execute("UPDATE fact_economicos SET vigente = 0 WHERE clave_hecho = ? AND vigente = 1", (clave,))
+        id_hecho = cursor.execute("SELECT COALESCE(MAX(id_hecho), 0) + 1 FROM fact_economicos").fetchone()[0]
+        cursor.execute('''
+        INSERT INTO fact_economicos (id_hecho, id_pais, id_costo, id_tiempo, valor, clave_hecho, hash_hecho)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (id_hecho, id_pais, id_costo, id_tiempo, valor, clave, hash_hecho))
+        afectados.add(origen)
+
+    actualizar_agregados(cursor, afectados)
+    conn.commit()
+
+def contenido_tablas(cursor):
+    return [cursor.execute(f"SELECT * FROM {tabla} ORDER BY 1").fetchall()
+            for tabla in ('dim_pais', 'fact_economicos', 'agg_pais', 'agg_costos_continente')]
+
+def medir(cargar, df, directorio, nombre):
+    db_path = os.path.join(directorio, f"{nombre}.db")
+    conn, cursor = crear_datawarehouse(db_path=db_path)
+    cargar_dimension_costos(cursor)
+    id_tiempo = cargar_dimension_tiempo(cursor)
+
+    inicio = time.perf_counter()
+    cargar(conn, cursor, df, id_tiempo)
+    duracion = time.perf_counter() - inicio
+
+    hechos = cursor.execute("SELECT COUNT(*) FROM fact_economicos").fetchone()[0]
+    contenido = contenido_tablas(cursor)
+    conn.close()
+    return duracion, hechos, contenido
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la carga de dim_pais y fact_economicos")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--limite-iterrows', type=int, default=100_000,
+                        help="Tamaño máximo para el que se mide la carga fila por fila")
+    args = parser.parse_args()
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as directorio:
+        for n in args.tamanos:
+            df = generar_datos_integrados(n)
+
+            t_vectorizado, hechos, contenido = medir(cargar_dataframe_integrado, df, directorio, f"vectorizado_{n}")
+            t_iterrows = None
+            if n <= args.limite_iterrows:
+                t_iterrows, _, contenido_iterrows = medir(cargar_iterrows, df, directorio, f"iterrows_{n}")
+                # ambos caminos deben dejar exactamente las mismas tablas
+                assert contenido == contenido_iterrows
+            resultados.append((n, hechos, t_iterrows, t_vectorizado))
+
+    print("\nBenchmark de carga del data warehouse\n")
+    print(f"{'países':>12} {'hechos':>12} {'iterrows (s)':>13} {'vectorizado (s)':>16} {'mejora':>8}")
+    for n, hechos, t_iterrows, t_vectorizado in resultados:
+        if t_iterrows is None:
+            print(f"{n:>12,} {hechos:>12,} {'-':>13} {t_vectorizado:>16.3f} {'-':>8}")
+        else:
+            print(f"{n:>12,} {hechos:>12,} {t_iterrows:>13.3f} {t_vectorizado:>16.3f} {t_iterrows / t_vectorizado:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
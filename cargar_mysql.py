@@ -0,0 +1,84 @@
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from mysql.connector import pooling
+from importador_mysql import importar_csv, cargar_cache_ddl, guardar_cache_ddl, esquema_cacheado, TAMANO_CHUNK
+
+MANIFIESTO = "manifiesto_mysql.json"
+MAX_WORKERS = 4
+
+MYSQL_CONFIG = {
+    'host': "localhost",
+    'user': "root",
+    'password': "16022004",
+    'database': "lab07_bdd2"
+}
+
+def leer_manifiesto(ruta=MANIFIESTO):
+    """Lista de entradas {archivo, tabla, claves}"""
+    with open(ruta, 'r', encoding='utf-8') as f:
+        entradas = json.load(f)
+    for entrada in entradas:
+        entrada.setdefault('claves', [])
+    return entradas
+
+def crear_pool(tamano, modo='multi'):
+    return pooling.MySQLConnectionPool(
+        pool_name="lab07_carga",
+        pool_size=tamano,
+        allow_local_infile=modo == 'load_data',
+        **MYSQL_CONFIG
+    )
+
+def cargar_entrada(pool, entrada, esquema, tamano_chunk, modo, reanudar):
+    conn = pool.get_connection()
+    try:
+        return importar_csv(conn, entrada['archivo'], entrada['tabla'], tamano_chunk, modo, reanudar,
+                            entrada['claves'], esquema)
+    finally:
+        # devuelve la conexión al pool
+        conn.close()
+
+def cargar_manifiesto(entradas, max_workers=MAX_WORKERS, tamano_chunk=TAMANO_CHUNK, modo='multi', reanudar=True):
+    """Carga todos los archivos del manifiesto en paralelo compartiendo un pool de conexiones"""
+    cache = cargar_cache_ddl()
+    esquemas = [esquema_cacheado(entrada['archivo'], cache) for entrada in entradas]
+    # las versiones anteriores de los archivos y los que salieron del manifiesto no vuelven a usarse
+    guardar_cache_ddl(cache, archivos=[entrada['archivo'] for entrada in entradas])
+
+    workers = max(1, min(max_workers, len(entradas)))
+    pool = crear_pool(workers, modo)
+
+    resultados = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futuros = {
+            executor.submit(cargar_entrada, pool, entrada, esquema, tamano_chunk, modo, reanudar): entrada
+            for entrada, esquema in zip(entradas, esquemas)
+        }
+        for futuro, entrada in futuros.items():
+            try:
+                resultados[entrada['tabla']] = futuro.result()
+            except Exception as e:
+                print(f"Error al cargar {entrada['archivo']} en {entrada['tabla']}: {e}")
+                resultados[entrada['tabla']] = None
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carga en MySQL los CSV listados en un manifiesto")
+    parser.add_argument('--manifiesto', default=MANIFIESTO, help="JSON con archivo, tabla y claves por entrada")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help="Archivos cargados a la vez")
+    parser.add_argument('--modo', choices=['multi', 'load_data'], default='multi',
+                        help="INSERT de varias filas o LOAD DATA LOCAL INFILE")
+    parser.add_argument('--chunk', type=int, default=TAMANO_CHUNK, help="Filas por chunk y por commit")
+    parser.add_argument('--desde-cero', action='store_true', help="Ignora el offset guardado de una importación anterior")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resultados = cargar_manifiesto(leer_manifiesto(args.manifiesto), args.workers, args.chunk, args.modo,
+                                   not args.desde_cero)
+
+    print("\nResumen de la carga:")
+    for tabla, filas in resultados.items():
+        print(f"  - {tabla}: {'error' if filas is None else f'{filas} filas'}")
+    print(f"Tiempo total: {time.perf_counter() - inicio:.3f}s")
@@ -0,0 +1,45 @@
+import json
+import numpy as np
+import pandas as pd
+
+COLUMNAS_ESTADISTICAS = ['poblacion', 'precio_big_mac_usd', 'tasa_de_envejecimiento']
+AGREGACIONES = ['sum', 'mean', 'max', 'min', 'idxmax', 'idxmin']
+
+def a_python(valor):
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and np.isnan(valor):
+        return None
+    return valor
+
+def calcular_estadisticas(df, columnas=COLUMNAS_ESTADISTICAS, columna_nombre='pais', columna_grupo='continente'):
+    """Calcula en una sola llamada a agg todas las métricas por columna y devuelve un dict serializable"""
+    resultado = {'registros': len(df), 'grupos': {}, 'columnas': {}}
+
+    if columna_grupo in df.columns:
+        conteos = df[columna_grupo].value_counts()
+        resultado['grupos'] = {str(grupo): int(count) for grupo, count in conteos.items()}
+
+    columnas = [col for col in columnas if col in df.columns and df[col].notna().any()]
+    if not columnas:
+        return resultado
+
+    agregados = df[columnas].agg(AGREGACIONES)
+    nombres = df[columna_nombre] if columna_nombre in df.columns else pd.Series(df.index, index=df.index)
+
+    for col in columnas:
+        metricas = agregados[col]
+        resultado['columnas'][col] = {
+            'suma': a_python(metricas['sum']),
+            'media': a_python(metricas['mean']),
+            'maximo': a_python(metricas['max']),
+            'minimo': a_python(metricas['min']),
+            'nombre_maximo': a_python(nombres.loc[metricas['idxmax']]),
+            'nombre_minimo': a_python(nombres.loc[metricas['idxmin']])
+        }
+
+    return resultado
+
+def guardar_estadisticas(estadisticas, ruta):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(estadisticas, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,48 @@
+import hashlib
+import os
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+ALGORITMO = 'xxh3_128' if xxhash else 'sha256'
+TAMANO_BLOQUE = 1 << 20
+
+def hash_archivo(ruta):
+    h = xxhash.xxh3_128() if xxhash else hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(TAMANO_BLOQUE), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+def calcular_huella(ruta, anterior=None):
+    """Tamaño, mtime y hash del archivo; si tamaño y mtime coinciden con la huella anterior no se vuelve a leer"""
+    info = os.stat(ruta)
+    huella = {
+        'archivo': os.path.basename(ruta),
+        'tamano': info.st_size,
+        'mtime_ns': info.st_mtime_ns,
+        'algoritmo': ALGORITMO
+    }
+    if anterior and all(anterior.get(k) == huella[k] for k in ('tamano', 'mtime_ns', 'algoritmo')):
+        huella['hash'] = anterior['hash']
+    else:
+        huella['hash'] = hash_archivo(ruta)
+    return huella
+
+def sin_cambios(huella, anterior):
+    return (anterior is not None
+            and anterior.get('algoritmo') == huella['algoritmo']
+            and anterior.get('hash') == huella['hash'])
+
+def detectar_cambios(rutas, anteriores):
+    """anteriores: archivo -> huella guardada; devuelve (rutas cambiadas, huellas actuales de todas las rutas)"""
+    cambiados, huellas = [], []
+    for ruta in rutas:
+        anterior = anteriores.get(os.path.basename(ruta))
+        huella = calcular_huella(ruta, anterior)
+        huellas.append(huella)
+        if not sin_cambios(huella, anterior):
+            cambiados.append(ruta)
+    return cambiados, huellas
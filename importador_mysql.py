@@ -0,0 +1,182 @@
+import csv
+import json
+import os
+import tempfile
+import time
+import pandas as pd
+
+TAMANO_CHUNK = 50000
+FILAS_MUESTRA = 10000
+TABLA_PROGRESO = "importacion_progreso"
+CACHE_DDL = ".cache_ddl_mysql.json"
+
+def infer_sql_type(dtype):
+    if pd.api.types.is_integer_dtype(dtype):
+        return "INT"
+    elif pd.api.types.is_float_dtype(dtype):
+        return "FLOAT"
+    elif pd.api.types.is_bool_dtype(dtype):
+        return "BOOLEAN"
+    elif pd.api.types.is_datetime64_any_dtype(dtype):
+        return "DATETIME"
+    else:
+        return "VARCHAR(255)"
+
+def inferir_esquema(csv_path, filas_muestra=FILAS_MUESTRA):
+    """Tipos SQL por columna inferidos de las primeras filas del archivo"""
+    muestra = pd.read_csv(csv_path, nrows=filas_muestra)
+    return {col: infer_sql_type(muestra[col].dtype) for col in muestra.columns}
+
+def huella_archivo(csv_path):
+    """Identifica una versión del archivo sin leerlo: nombre, tamaño y fecha de modificación"""
+    info = os.stat(csv_path)
+    return f"{os.path.basename(csv_path)}:{info.st_size}:{info.st_mtime_ns}"
+
+def cargar_cache_ddl(ruta=CACHE_DDL):
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def guardar_cache_ddl(cache, ruta=CACHE_DDL, archivos=None):
+    """Guarda el cache; con archivos conserva solo los esquemas de sus versiones actuales"""
+    if archivos is not None:
+        vigentes = {huella_archivo(archivo) for archivo in archivos}
+        cache = {huella: esquema for huella, esquema in cache.items() if huella in vigentes}
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+
+def esquema_cacheado(csv_path, cache):
+    """Devuelve el esquema guardado para esta versión del archivo o lo infiere y lo agrega al cache"""
+    huella = huella_archivo(csv_path)
+    if huella not in cache:
+        cache[huella] = inferir_esquema(csv_path)
+    return cache[huella]
+
+def generar_ddl(table_name, esquema, claves=()):
+    columns = [f"`{col}` {col_type}" for col, col_type in esquema.items()]
+    if claves:
+        columns.append(f"PRIMARY KEY ({', '.join(f'`{col}`' for col in claves)})")
+    return f"CREATE TABLE IF NOT EXISTS `{table_name}` (\n  {', '.join(columns)}\n);"
+
+def asegurar_clave_primaria(cursor, table_name, claves):
+    """CREATE TABLE IF NOT EXISTS no toca tablas creadas sin clave por los scripts anteriores;
+    sin PRIMARY KEY los upserts no encuentran la fila y la recarga la duplica, así que se agrega aquí"""
+    cursor.execute(
+        "SELECT `COLUMN_NAME` FROM information_schema.KEY_COLUMN_USAGE "
+        "WHERE `TABLE_SCHEMA` = DATABASE() AND `TABLE_NAME` = %s AND `CONSTRAINT_NAME` = 'PRIMARY' "
+        "ORDER BY `ORDINAL_POSITION`",
+        (table_name,)
+    )
+    actuales = [fila[0] for fila in cursor.fetchall()]
+    if actuales == list(claves):
+        return
+    if actuales:
+        raise ValueError(f"{table_name} ya tiene PRIMARY KEY ({', '.join(actuales)}), distinta de ({', '.join(claves)})")
+
+    print(f"Agregando PRIMARY KEY ({', '.join(claves)}) a la tabla existente {table_name}")
+    try:
+        cursor.execute(f"ALTER TABLE `{table_name}` ADD PRIMARY KEY ({', '.join(f'`{col}`' for col in claves)})")
+    except Exception as e:
+        raise ValueError(f"No se pudo agregar la PRIMARY KEY a {table_name}; si tiene filas repetidas "
+                         f"de cargas anteriores hay que eliminarlas o vaciar la tabla: {e}") from e
+
+def leer_offset(cursor, table_name, csv_path):
+    """Filas ya importadas de esta versión del archivo; si cambió su huella la importación empieza de cero"""
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS `{TABLA_PROGRESO}` (
+        `tabla` VARCHAR(64) PRIMARY KEY,
+        `archivo` VARCHAR(255),
+        `filas` BIGINT
+    )
+    """)
+    cursor.execute(f"SELECT `archivo`, `filas` FROM `{TABLA_PROGRESO}` WHERE `tabla` = %s", (table_name,))
+    fila = cursor.fetchone()
+    # la columna 'archivo' guarda la huella (nombre, tamaño y mtime), no solo el nombre
+    if fila is None or fila[0] != huella_archivo(csv_path):
+        return 0
+    return fila[1]
+
+def guardar_offset(cursor, table_name, csv_path, filas):
+    cursor.execute(
+        f"REPLACE INTO `{TABLA_PROGRESO}` (`tabla`, `archivo`, `filas`) VALUES (%s, %s, %s)",
+        (table_name, huella_archivo(csv_path), filas)
+    )
+
+def insertar_chunk_multi(cursor, table_name, chunk, claves=()):
+    # mysql.connector reescribe executemany de un INSERT ... VALUES en sentencias de varias filas
+    columnas = ', '.join(f"`{col}`" for col in chunk.columns)
+    marcadores = ', '.join('%s' for _ in chunk.columns)
+    query = f"INSERT INTO `{table_name}` ({columnas}) VALUES ({marcadores})"
+    actualizar = [col for col in chunk.columns if col not in claves]
+    if claves and actualizar:
+        query += " ON DUPLICATE KEY UPDATE " + ', '.join(f"`{col}` = VALUES(`{col}`)" for col in actualizar)
+    filas = chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+    cursor.executemany(query, list(filas))
+
+def insertar_chunk_load_data(cursor, table_name, chunk, claves=()):
+    """Vuelca el chunk a un CSV temporal y lo carga con LOAD DATA LOCAL INFILE (requiere allow_local_infile)"""
+    # con el escape por defecto '\\' MySQL lee \N como nulo, así que las barras de los textos se duplican
+    # y un texto "NULL" o "\N" no se confunde con un valor ausente
+    texto = chunk.select_dtypes(include='object').columns
+    chunk = chunk.assign(**{
+        col: chunk[col].map(lambda v: v.replace('\\', '\\\\') if isinstance(v, str) else v) for col in texto
+    })
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8', newline='') as f:
+        chunk.to_csv(f, index=False, header=False, na_rep='\\N', quoting=csv.QUOTE_MINIMAL, lineterminator='\n')
+        ruta = f.name
+    try:
+        columnas = ', '.join(f"`{col}`" for col in chunk.columns)
+        # MySQL interpreta las barras invertidas de la ruta como escapes; las rutas de Windows aceptan '/'
+        ruta_sql = ruta.replace('\\', '/').replace("'", "\\'")
+        cursor.execute(f"""
+        LOAD DATA LOCAL INFILE '{ruta_sql}' {'REPLACE ' if claves else ''}INTO TABLE `{table_name}`
+        CHARACTER SET utf8mb4
+        FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY '\\\\'
+        LINES TERMINATED BY '\\n'
+        ({columnas})
+        """)
+    finally:
+        os.remove(ruta)
+
+def importar_csv(conn, csv_path, table_name, tamano_chunk=TAMANO_CHUNK, modo='multi', reanudar=True,
+                 claves=(), esquema=None):
+    """Crea la tabla a partir de una muestra y carga el CSV por chunks con un commit y un offset por chunk;
+    con claves la tabla tiene PRIMARY KEY y volver a cargar una fila la actualiza en lugar de duplicarla"""
+    cursor = conn.cursor()
+
+    if esquema is None:
+        esquema = inferir_esquema(csv_path)
+    ddl = generar_ddl(table_name, esquema, claves)
+    print("DDL generado:\n", ddl)
+    cursor.execute(ddl)
+    if claves:
+        asegurar_clave_primaria(cursor, table_name, claves)
+
+    offset = leer_offset(cursor, table_name, csv_path) if reanudar else 0
+    conn.commit()
+    if offset:
+        print(f"Reanudando {table_name} desde la fila {offset}")
+
+    insertar = insertar_chunk_load_data if modo == 'load_data' else insertar_chunk_multi
+    lector = pd.read_csv(csv_path, chunksize=tamano_chunk, skiprows=range(1, offset + 1))
+
+    total = offset
+    inicio_total = time.perf_counter()
+    for numero, chunk in enumerate(lector, start=1):
+        if chunk.empty:
+            continue
+        inicio = time.perf_counter()
+        insertar(cursor, table_name, chunk, claves)
+        total += len(chunk)
+        guardar_offset(cursor, table_name, csv_path, total)
+        conn.commit()
+        duracion = time.perf_counter() - inicio
+
+        velocidad = len(chunk) / duracion if duracion > 0 else float('inf')
+        print(f"  - {table_name} chunk {numero}: {len(chunk)} filas en {duracion:.3f}s ({velocidad:,.0f} filas/s, modo {modo})")
+
+    duracion_total = time.perf_counter() - inicio_total
+    print(f"{table_name}: {total - offset} filas importadas en {duracion_total:.3f}s ({total} en total)")
+    cursor.close()
+    return total
@@ -0,0 +1,107 @@
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    # solo existe en sistemas POSIX
+    resource = None
+
+def rss_maximo_mb():
+    """RSS máximo del proceso en MB, o None donde no hay módulo resource (Windows)"""
+    if resource is None:
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB y macOS bytes
+    return maximo / (1024 * 1024) if sys.platform == 'darwin' else maximo / 1024
+
+def contar_filas(*dataframes):
+    return sum(len(df) for df in dataframes if df is not None)
+
+def crear_reporte(nombre, memoria=False, perfilar=False):
+    """Reporte de una ejecución; memoria activa tracemalloc y perfilar guarda un cProfile por etapa"""
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return {
+        'ejecucion': nombre,
+        'inicio': datetime.now().isoformat(timespec='seconds'),
+        'memoria': memoria,
+        'perfilar': perfilar,
+        'etapas': [],
+        '_perfiles': {}
+    }
+
+@contextmanager
+def medir_etapa(reporte, nombre, filas_entrada=None):
+    """Mide tiempo real, tiempo de CPU, memoria y filas de una etapa; el bloque puede fijar registro['filas_salida']"""
+    registro = {'etapa': nombre, 'filas_entrada': filas_entrada, 'filas_salida': None}
+
+    perfil = cProfile.Profile() if reporte['perfilar'] else None
+    # ru_maxrss es el pico de toda la vida del proceso; por etapa solo se registra cuánto lo elevó
+    rss_inicio = rss_maximo_mb()
+    if reporte['memoria']:
+        tracemalloc.reset_peak()
+        memoria_inicio = tracemalloc.get_traced_memory()[0]
+    inicio_real = time.perf_counter()
+    inicio_cpu = time.process_time()
+    if perfil:
+        perfil.enable()
+
+    try:
+        yield registro
+    finally:
+        if perfil:
+            perfil.disable()
+        registro['tiempo_real_s'] = round(time.perf_counter() - inicio_real, 6)
+        registro['tiempo_cpu_s'] = round(time.process_time() - inicio_cpu, 6)
+        rss = rss_maximo_mb()
+        registro['rss_pico_incremento_mb'] = None if rss is None else round(rss - rss_inicio, 2)
+        if reporte['memoria']:
+            actual, pico = tracemalloc.get_traced_memory()
+            registro['memoria_delta_mb'] = round((actual - memoria_inicio) / (1024 * 1024), 3)
+            registro['memoria_pico_mb'] = round((pico - memoria_inicio) / (1024 * 1024), 3)
+        if perfil:
+            reporte['_perfiles'][nombre] = perfil
+        reporte['etapas'].append(registro)
+
+def etapa_mas_lenta(reporte):
+    if not reporte['etapas']:
+        return None
+    return max(reporte['etapas'], key=lambda registro: registro['tiempo_real_s'])
+
+def guardar_reporte(reporte, directorio='reportes'):
+    """Escribe el reporte JSON de la ejecución y, si se perfiló, el cProfile de la etapa más lenta"""
+    os.makedirs(directorio, exist_ok=True)
+    marca = datetime.now().strftime('%Y%m%d_%H%M%S')
+    base = os.path.join(directorio, f"{reporte['ejecucion']}_{marca}")
+
+    salida = {k: v for k, v in reporte.items() if not k.startswith('_')}
+    salida['tiempo_total_s'] = round(sum(r['tiempo_real_s'] for r in reporte['etapas']), 6)
+    lenta = etapa_mas_lenta(reporte)
+    salida['etapa_mas_lenta'] = lenta['etapa'] if lenta else None
+
+    if lenta and lenta['etapa'] in reporte['_perfiles']:
+        ruta_perfil = f"{base}_{lenta['etapa']}.prof"
+        reporte['_perfiles'][lenta['etapa']].dump_stats(ruta_perfil)
+        salida['perfil'] = ruta_perfil
+
+    ruta = f"{base}.json"
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(salida, f, ensure_ascii=False, indent=2)
+    return ruta
+
+def imprimir_reporte(reporte):
+    print("\nTiempos por etapa:")
+    print(f"{'etapa':<14} {'real (s)':>9} {'cpu (s)':>9} {'pico (MB)':>10} {'filas ent.':>11} {'filas sal.':>11}")
+    for r in reporte['etapas']:
+        pico = r.get('memoria_pico_mb')
+        print(f"{r['etapa']:<14} {r['tiempo_real_s']:>9.3f} {r['tiempo_cpu_s']:>9.3f} "
+              f"{'-' if pico is None else f'{pico:.1f}':>10} "
+              f"{'-' if r['filas_entrada'] is None else r['filas_entrada']:>11} "
+              f"{'-' if r['filas_salida'] is None else r['filas_salida']:>11}")
@@ -0,0 +1,104 @@
+import json
+import re
+
+TAMANO_BLOQUE = 1 << 20
+
+_ESPACIOS = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+class _Incompleto(Exception):
+    """El bloque leído termina a mitad de un valor"""
+
+def _decodificar(buffer, pos, con_clave):
+    """Decodifica desde pos un valor (o un par clave: valor) y devuelve (resultado, posición final)"""
+    if con_clave:
+        clave, pos = _decoder.raw_decode(buffer, pos)
+        pos = _ESPACIOS.match(buffer, pos).end()
+        if pos >= len(buffer):
+            raise _Incompleto
+        if buffer[pos] != ':':
+            raise json.JSONDecodeError("Se esperaba ':'", buffer, pos)
+        pos = _ESPACIOS.match(buffer, pos + 1).end()
+    valor, fin = _decoder.raw_decode(buffer, pos)
+    # un número solo está completo si ya se ve el delimitador que lo sigue ("7." puede ser "7.25")
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        siguiente = _ESPACIOS.match(buffer, fin).end()
+        if siguiente >= len(buffer) or buffer[siguiente] not in ',]}':
+            raise _Incompleto
+    return ((clave, valor) if con_clave else valor), fin
+
+def _es_truncamiento(error, buffer):
+    # un bloque cortado falla en los últimos caracteres (true/false/null miden hasta 5)
+    # o deja un string sin cerrar; cualquier otro error es de sintaxis
+    return error.msg.startswith('Unterminated string') or error.pos >= len(buffer) - 5
+
+def _iterar(ruta, apertura, tamano_bloque):
+    cierre = ']' if apertura == '[' else '}'
+    con_clave = apertura == '{'
+    with open(ruta, 'r', encoding='utf-8') as f:
+        buffer = f.read(tamano_bloque)
+        pos = _ESPACIOS.match(buffer, 0).end()
+        while pos >= len(buffer):
+            bloque = f.read(tamano_bloque)
+            if not bloque:
+                break
+            buffer = buffer[pos:] + bloque
+            pos = _ESPACIOS.match(buffer, 0).end()
+        fin_archivo = False
+        if buffer[pos:pos + 1] != apertura:
+            raise ValueError(f"{ruta} no empieza con '{apertura}'")
+        pos += 1
+        esperando_valor, primero = True, True
+
+        while True:
+            pos = _ESPACIOS.match(buffer, pos).end()
+            if pos >= len(buffer):
+                if fin_archivo:
+                    raise ValueError(f"{ruta} termina antes de cerrar '{apertura}'")
+                bloque = f.read(tamano_bloque)
+                fin_archivo = not bloque
+                buffer, pos = buffer[pos:] + bloque, 0
+                continue
+
+            caracter = buffer[pos]
+            if caracter == cierre and (primero or not esperando_valor):
+                return
+            if not esperando_valor:
+                if caracter != ',':
+                    raise ValueError(f"Se esperaba ',' o '{cierre}' en {ruta}")
+                pos += 1
+                esperando_valor = True
+                continue
+
+            try:
+                resultado, fin = _decodificar(buffer, pos, con_clave)
+            except (_Incompleto, json.JSONDecodeError) as e:
+                if isinstance(e, json.JSONDecodeError) and (fin_archivo or not _es_truncamiento(e, buffer)):
+                    raise ValueError(f"JSON inválido en {ruta}: {e.msg}") from e
+                if fin_archivo:
+                    raise ValueError(f"Documento incompleto al final de {ruta}")
+                # se lee al menos tanto como lo pendiente para no re-decodificar un documento grande muchas veces
+                bloque = f.read(max(tamano_bloque, len(buffer) - pos))
+                fin_archivo = not bloque
+                buffer, pos = buffer[pos:] + bloque, 0
+                continue
+
+            yield resultado
+            pos = fin
+            esperando_valor, primero = False, False
+
+def tipo_raiz(ruta):
+    """'[' si el archivo es un arreglo JSON, '{' si es un objeto"""
+    with open(ruta, 'r', encoding='utf-8') as f:
+        while True:
+            caracter = f.read(1)
+            if not caracter or not caracter.isspace():
+                return caracter
+
+def iterar_elementos(ruta, tamano_bloque=TAMANO_BLOQUE):
+    """Genera uno a uno los elementos de un arreglo JSON sin cargar el archivo completo"""
+    return _iterar(ruta, '[', tamano_bloque)
+
+def iterar_miembros(ruta, tamano_bloque=TAMANO_BLOQUE):
+    """Genera uno a uno los pares (clave, valor) de un objeto JSON sin cargar el archivo completo"""
+    return _iterar(ruta, '{', tamano_bloque)
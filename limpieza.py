@@ -0,0 +1,57 @@
+MEDIA = ('media', None)
+MEDIANA = ('mediana', None)
+
+def constante(valor):
+    return ('constante', valor)
+
+def resolver_politicas(df, politicas, numericas=None):
+    """Política por columna presente en df; numericas se aplica a las columnas numéricas sin política propia"""
+    resueltas = {col: politica for col, politica in politicas.items() if col in df.columns}
+    if numericas is not None:
+        for col in df.select_dtypes(include='number').columns:
+            resueltas.setdefault(col, numericas)
+    return resueltas
+
+def calcular_rellenos(df, politicas, nulos):
+    """Valor de relleno de cada columna con nulos; las medias y medianas se calculan en una sola llamada cada una"""
+    pendientes = {col: politica for col, politica in politicas.items() if nulos.get(col, 0) > 0}
+
+    por_tipo = {'media': [], 'mediana': []}
+    for col, (tipo, _) in pendientes.items():
+        if tipo in por_tipo:
+            por_tipo[tipo].append(col)
+    estadisticos = {
+        'media': df[por_tipo['media']].mean() if por_tipo['media'] else {},
+        'mediana': df[por_tipo['mediana']].median() if por_tipo['mediana'] else {}
+    }
+
+    rellenos = {}
+    for col, (tipo, valor) in pendientes.items():
+        rellenos[col] = {
+            'tipo': tipo,
+            'valor': valor if tipo == 'constante' else estadisticos[tipo][col],
+            'nulos': int(nulos[col])
+        }
+    return rellenos
+
+def analizar_nulos(df, politicas, numericas=None):
+    """Cuenta los nulos de todas las columnas en una pasada y calcula los rellenos; devuelve (nulos, rellenos)"""
+    nulos = df.isna().sum()
+    if not nulos.any():
+        return nulos, {}
+    return nulos, calcular_rellenos(df, resolver_politicas(df, politicas, numericas), nulos)
+
+def limpiar_nulos(df, politicas, numericas=None):
+    """Rellena todas las columnas con un único fillna; devuelve (df, nulos, rellenos)"""
+    nulos, rellenos = analizar_nulos(df, politicas, numericas)
+    if not rellenos:
+        return df, nulos, rellenos
+    df_limpio = df.fillna({col: relleno['valor'] for col, relleno in rellenos.items()})
+    return df_limpio, nulos, rellenos
+
+def describir_rellenos(rellenos):
+    for col, relleno in rellenos.items():
+        if relleno['tipo'] == 'constante':
+            print(f"  - {relleno['nulos']} valores nulos en '{col}' rellenados con '{relleno['valor']}'")
+        else:
+            print(f"  - {relleno['nulos']} valores nulos en '{col}' rellenados con la {relleno['tipo']}: {relleno['valor']:.2f}")
@@ -0,0 +1,80 @@
+import csv
+import difflib
+import os
+import re
+import unicodedata
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+RUTA_ALIAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'paises_alias.csv')
+UMBRAL_DIFUSO = 0.85
+
+_indice_alias = None
+
+def plegar(nombre):
+    """Clave de búsqueda: minúsculas, sin acentos y sin signos de puntuación"""
+    texto = unicodedata.normalize('NFKD', str(nombre).strip().lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return re.sub(r'[^a-z0-9]+', ' ', texto).strip()
+
+def construir_indice(ruta=RUTA_ALIAS):
+    """Índice clave plegada -> nombre canónico (nombre en español en minúsculas)"""
+    indice = {}
+    with open(ruta, 'r', encoding='utf-8', newline='') as f:
+        for fila in csv.DictReader(f):
+            canonico = fila['nombre_es'].lower()
+            alias = [fila['iso2'], fila['iso3'], fila['nombre_es'], fila['nombre_en']]
+            alias.extend(a for a in fila['alias'].split(';') if a)
+            for a in alias:
+                indice.setdefault(plegar(a), canonico)
+    return indice
+
+def obtener_indice():
+    global _indice_alias
+    if _indice_alias is None:
+        _indice_alias = construir_indice()
+    return _indice_alias
+
+@lru_cache(maxsize=None)
+def candidatos_difusos(longitud):
+    """Claves con una longitud compatible con UMBRAL_DIFUSO; las demás no pueden alcanzar el umbral"""
+    # ratio = 2 * coincidencias / (len_a + len_b) <= 2 * min / (len_a + len_b)
+    return [clave for clave in obtener_indice()
+            if 2 * min(len(clave), longitud) / (len(clave) + longitud) >= UMBRAL_DIFUSO]
+
+@lru_cache(maxsize=None)
+def resolver_difuso(clave):
+    candidatos = candidatos_difusos(len(clave))
+    coincidencias = difflib.get_close_matches(clave, candidatos, n=1, cutoff=UMBRAL_DIFUSO)
+    return obtener_indice()[coincidencias[0]] if coincidencias else None
+
+def resolver_nombres(nombres):
+    """Resuelve una lista de nombres únicos: primero coincidencia exacta y luego difusa"""
+    indice = obtener_indice()
+    claves = pd.Series([plegar(n) for n in nombres], dtype=object)
+    resueltos = claves.map(indice)
+
+    pendientes = resueltos.isna()
+    resueltos[pendientes] = [resolver_difuso(c) for c in claves[pendientes]]
+
+    sin_resolver = resueltos.isna()
+    resueltos[sin_resolver] = [str(n).strip().lower() for n in np.asarray(nombres, dtype=object)[sin_resolver.to_numpy()]]
+
+    estadisticas = {
+        'exactos': int((~pendientes).sum()),
+        'difusos': int((pendientes & ~sin_resolver).sum()),
+        'sin_resolver': int(sin_resolver.sum())
+    }
+    return resueltos.to_numpy(dtype=object), estadisticas
+
+def normalizar_serie(serie):
+    """Normaliza una columna de nombres de país resolviendo cada nombre distinto una sola vez"""
+    codigos, unicos = pd.factorize(serie)
+    if len(unicos) == 0:
+        return pd.Series(np.nan, index=serie.index, dtype=object), {'exactos': 0, 'difusos': 0, 'sin_resolver': 0}
+
+    resueltos, estadisticas = resolver_nombres(unicos)
+    valores = resueltos.take(codigos)
+    valores[codigos == -1] = np.nan
+    return pd.Series(valores, index=serie.index, dtype=object), estadisticas
@@ -1,3 +1,5 @@
+import argparse
+import asyncio
 import pandas as pd
 import numpy as np
 import sqlite3
@@ -7,6 +9,15 @@ import os
 from dotenv import load_dotenv
 import json
 
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+from normalizacion_paises import normalizar_serie
+from estadisticas import calcular_estadisticas, guardar_estadisticas
+from instrumentacion import crear_reporte, medir_etapa, contar_filas, guardar_reporte, imprimir_reporte
+
 load_dotenv()
 
 DB_RELACIONAL_PATH = 'datos_paises.db' 
@@ -15,6 +26,36 @@ MONGO_URI = os.getenv("MONGO_URI", "mongodb+srv://giovannisantos1890:<>@cluster0
 MONGO_DB = "paisesDB"
 MONGO_COLLECTIONS = ["big_mac_index", "costos_turisticos"]
 
+MONGO_BATCH_SIZE = 1000
+TAMANO_LOTE_DF = 10000
+
+UMBRAL_CATEGORIA = 0.5
+
+ARCHIVOS_SALIDA = {
+    'arrow': 'datos_integrados.arrow',
+    'parquet': 'datos_integrados.parquet',
+    'csv': 'datos_integrados.csv'
+}
+FORMATOS_SALIDA = ('arrow', 'csv')
+ARCHIVO_ESTADISTICAS = 'estadisticas_integradas.json'
+# el formato columnar se escribe al final para que sea el más reciente y lo lea el data warehouse
+ORDEN_ESCRITURA = ('csv', 'parquet', 'arrow')
+
+PROYECCION_BIG_MAC = {
+    '_id': 0, 'pais': 1, 'continente': 1, 'precio_big_mac_usd': 1, 'tipo_dato': 1
+}
+PROYECCION_COSTOS = {
+    '_id': 0, 'pais': 1, 'continente': 1, 'poblacion': 1, 'capital': 1,
+    'region': 1, 'costos': 1, 'tipo_dato': 1, 'fuente': 1
+}
+
+COLUMNAS_BIG_MAC = [col for col, incluir in PROYECCION_BIG_MAC.items() if incluir and col != '_id']
+COLUMNAS_COSTOS_BASE = [col for col, incluir in PROYECCION_COSTOS.items() if incluir and col not in ('_id', 'costos')]
+PREFIJO_BIG_MAC = "big_mac_"
+
+# sufijos de los merges encadenados: relacionales, + Big Mac, + costos turísticos
+SUFIJOS_INTEGRACION = [('_env', '_pob'), ('_rel', '_big_mac'), ('_previo', '_costos')]
+
 def conectar_sqlite():
     try:
         engine = create_engine(f'sqlite:///{DB_RELACIONAL_PATH}')
@@ -34,71 +75,189 @@ def conectar_mongodb():
         print(f"Error al conectar con MongoDB Atlas: {e}")
         return None
 
+def extraer_tabla(engine, tabla):
+    df = pd.read_sql(f"SELECT * FROM {tabla}", engine)
+    print(f"Datos extraídos de {tabla}: {len(df)} registros")
+    return df
+
 def extraer_datos_relacionales(engine):
     try:
-        query_envejecimiento = "SELECT * FROM pais_envejecimiento"
-        df_envejecimiento = pd.read_sql(query_envejecimiento, engine)
-        print(f"Datos extraídos de la pais_envejecimiento: {len(df_envejecimiento)} registros")
-        
-        query_poblacion = "SELECT * FROM pais_poblacion"
-        df_poblacion = pd.read_sql(query_poblacion, engine)
-        print(f"Datos extraídos de pais_poblacion: {len(df_poblacion)} registros")
-        
+        df_envejecimiento = extraer_tabla(engine, "pais_envejecimiento")
+        df_poblacion = extraer_tabla(engine, "pais_poblacion")
         return df_envejecimiento, df_poblacion
     except Exception as e:
         print(f"Error al extraer datos relacionales: {e}")
         return None, None
 
+def dataframe_por_lotes(cursor, columnas, tamano_lote=TAMANO_LOTE_DF):
+    """Recorre un cursor de MongoDB armando el DataFrame lote a lote; columnas se usa si no llega ningún documento"""
+    lotes = []
+    lote = []
+    for documento in cursor:
+        lote.append(documento)
+        if len(lote) >= tamano_lote:
+            lotes.append(pd.DataFrame(lote))
+            lote = []
+    if lote:
+        lotes.append(pd.DataFrame(lote))
+    
+    if not lotes:
+        return pd.DataFrame(columns=columnas)
+    
+    return pd.concat(lotes, ignore_index=True)
+
+def extraer_coleccion_por_lotes(collection, proyeccion, batch_size=MONGO_BATCH_SIZE, tamano_lote=TAMANO_LOTE_DF):
+    """Lee una colección con proyección en el servidor y arma el DataFrame lote a lote"""
+    cursor = collection.find({}, proyeccion, batch_size=batch_size)
+    return dataframe_por_lotes(cursor, [col for col, incluir in proyeccion.items() if incluir], tamano_lote)
+
+def extraer_coleccion(client, nombre, proyeccion):
+    df = extraer_coleccion_por_lotes(client[MONGO_DB][nombre], proyeccion)
+    print(f"Datos extraídos de la colección {nombre}: {len(df)} registros")
+    return df
+
 def extraer_datos_mongodb(client):
     try:
-        db = client[MONGO_DB]
-        
-        big_mac_data = list(db["big_mac_index"].find())
-        df_big_mac = pd.DataFrame(big_mac_data)
-        print(f"Datos extraídos de la colección big_mac_index: {len(df_big_mac)} registros")
-        
-        costos_data = list(db["costos_turisticos"].find())
-        df_costos = pd.DataFrame(costos_data)
-        print(f"Datos extraídos de la colección costos_turisticos: {len(df_costos)} registros")
-        
+        df_big_mac = extraer_coleccion(client, "big_mac_index", PROYECCION_BIG_MAC)
+        df_costos = extraer_coleccion(client, "costos_turisticos", PROYECCION_COSTOS)
         return df_big_mac, df_costos
     except Exception as e:
         print(f"Error al extraer datos de MongoDB: {e}")
         return None, None
 
+def mismo_pais(variable):
+    """Etapa de un $lookup con pipeline: documentos cuyo 'pais' en minúsculas coincide con $$variable"""
+    return {'$match': {'$expr': {'$eq': [{'$toLower': '$pais'}, f'$${variable}']}}}
+
+def pipeline_documental():
+    """Aplana 'costos', une big_mac_index por el nombre en minúsculas y agrega los países de Big Mac sin costos,
+    todo en una sola agregación de solo lectura (requiere MongoDB 4.4 o posterior por $unionWith)"""
+    columnas_big_mac = {f'{PREFIJO_BIG_MAC}{col}': f'${col}' for col in COLUMNAS_BIG_MAC}
+    return [
+        {'$lookup': {
+            'from': 'big_mac_index',
+            'let': {'clave': {'$toLower': '$pais'}},
+            'pipeline': [
+                mismo_pais('clave'),
+                {'$limit': 1},
+                {'$project': {'_id': 0, **columnas_big_mac}}
+            ],
+            'as': '_big_mac'
+        }},
+        # ante claves repetidas gana la de 'costos' sobre las columnas base; sin Big Mac el tercer objeto es {}
+        {'$replaceRoot': {'newRoot': {'$mergeObjects': [
+            {col: f'${col}' for col in COLUMNAS_COSTOS_BASE},
+            '$costos',
+            {'$ifNull': [{'$arrayElemAt': ['$_big_mac', 0]}, {}]}
+        ]}}},
+        {'$unionWith': {'coll': 'big_mac_index', 'pipeline': [
+            {'$lookup': {
+                'from': 'costos_turisticos',
+                'let': {'clave': {'$toLower': '$pais'}},
+                'pipeline': [mismo_pais('clave'), {'$limit': 1}, {'$project': {'_id': 1}}],
+                'as': '_costos'
+            }},
+            {'$match': {'_costos': {'$size': 0}}},
+            {'$replaceRoot': {'newRoot': columnas_big_mac}}
+        ]}}
+    ]
+
+def extraer_documental_pushdown(client):
+    """Trae de MongoDB las filas de costos ya aplanadas y unidas con Big Mac, más los países de Big Mac sin costos,
+    en un único DataFrame; las columnas de Big Mac llevan el prefijo PREFIJO_BIG_MAC.
+    No escribe en la base: basta con permiso de lectura y no quedan colecciones temporales"""
+    cursor = client[MONGO_DB]["costos_turisticos"].aggregate(pipeline_documental(), batchSize=MONGO_BATCH_SIZE)
+    df_documental = dataframe_por_lotes(cursor, COLUMNAS_COSTOS_BASE)
+    
+    # las filas de big_mac_index sin costos solo traen columnas con el prefijo
+    columnas_big_mac = [col for col in df_documental.columns if col.startswith(PREFIJO_BIG_MAC)]
+    columnas_costos = [col for col in df_documental.columns if not col.startswith(PREFIJO_BIG_MAC)]
+    de_costos = df_documental[columnas_costos].notna().any(axis=1)
+    con_big_mac = df_documental[columnas_big_mac].notna().any(axis=1)
+    print(f"Filas pre-unidas recibidas de MongoDB: {len(df_documental)} "
+          f"({de_costos.sum()} de costos_turisticos, {(de_costos & con_big_mac).sum()} países con Big Mac, "
+          f"{(~de_costos).sum()} de big_mac_index sin costos)")
+    return df_documental
+
+async def extraer_fuentes_async(engine, client, pushdown=False):
+    """Lanza las lecturas a la vez; pymongo y sqlite3 liberan el GIL mientras esperan E/S"""
+    relacionales = [
+        asyncio.to_thread(extraer_tabla, engine, "pais_envejecimiento"),
+        asyncio.to_thread(extraer_tabla, engine, "pais_poblacion")
+    ]
+    if pushdown:
+        return await asyncio.gather(*relacionales, asyncio.to_thread(extraer_documental_pushdown, client))
+    
+    return await asyncio.gather(
+        *relacionales,
+        asyncio.to_thread(extraer_coleccion, client, "big_mac_index", PROYECCION_BIG_MAC),
+        asyncio.to_thread(extraer_coleccion, client, "costos_turisticos", PROYECCION_COSTOS)
+    )
+
+def extraer_fuentes(engine, client, concurrente=True, pushdown=False):
+    """Devuelve (envejecimiento, poblacion, big_mac, costos) o None si falla alguna fuente;
+    con pushdown devuelve (envejecimiento, poblacion, documental) con costos y Big Mac ya unidos en MongoDB"""
+    if not concurrente:
+        df_envejecimiento, df_poblacion = extraer_datos_relacionales(engine)
+        if df_envejecimiento is None:
+            return None
+        if pushdown:
+            try:
+                return df_envejecimiento, df_poblacion, extraer_documental_pushdown(client)
+            except Exception as e:
+                print(f"Error al extraer datos de MongoDB: {e}")
+                return None
+        df_big_mac, df_costos = extraer_datos_mongodb(client)
+        if df_big_mac is None:
+            return None
+        return df_envejecimiento, df_poblacion, df_big_mac, df_costos
+    
+    try:
+        return tuple(asyncio.run(extraer_fuentes_async(engine, client, pushdown)))
+    except Exception as e:
+        print(f"Error al extraer las fuentes: {e}")
+        return None
+
 def normalizar_nombres_paises(df, columna_pais):
     if columna_pais not in df.columns:
         print(f"La columna '{columna_pais}' no existe en el DataFrame")
         return df
     
-    df[f"{columna_pais}_norm"] = df[columna_pais].str.lower()
+    df[f"{columna_pais}_norm"], estadisticas = normalizar_serie(df[columna_pais])
     
-    reemplazos = {
-        'united states': 'estados unidos',
-        'united states of america': 'estados unidos',
-        'usa': 'estados unidos',
-        'united kingdom': 'reino unido',
-        'uk': 'reino unido',
-        'czech republic': 'república checa',
-        'russia': 'rusia',
-        'vatican city': 'ciudad del vaticano'
-    }
-    
-    df[f"{columna_pais}_norm"] = df[f"{columna_pais}_norm"].replace(reemplazos)
+    if estadisticas['difusos'] or estadisticas['sin_resolver']:
+        print(f"Nombres de '{columna_pais}': {estadisticas['exactos']} exactos, "
+              f"{estadisticas['difusos']} por similitud, {estadisticas['sin_resolver']} sin resolver")
     
     return df
 
-def preparar_dataframes(df_envejecimiento, df_poblacion, df_big_mac, df_costos):
+def expandir_costos_iterativo(df_costos):
+    """Expande la columna 'costos' fila por fila (modo original)"""
+    for registro in df_costos.itertuples():
+        if isinstance(registro.costos, dict):
+            for clave, valor in registro.costos.items():
+                if clave not in df_costos.columns:
+                    df_costos[clave] = None
+                df_costos.at[registro.Index, clave] = valor
+    
+    return df_costos.drop('costos', axis=1)
 
+def expandir_costos_columnar(df_costos):
+    """Expande la columna 'costos' en una sola pasada construyendo todas las columnas a la vez"""
+    registros = [c if isinstance(c, dict) else {} for c in df_costos['costos']]
+    df_expandido = pd.DataFrame.from_records(registros, index=df_costos.index)
+    
+    df_base = df_costos.drop('costos', axis=1)
+    
+    columnas_repetidas = [col for col in df_expandido.columns if col in df_base.columns]
+    for col in columnas_repetidas:
+        df_base[col] = df_expandido.pop(col).combine_first(df_base[col])
+    
+    return pd.concat([df_base, df_expandido], axis=1)
+
+def preparar_relacionales(df_envejecimiento, df_poblacion):
     df_envejecimiento = normalizar_nombres_paises(df_envejecimiento, 'nombre_pais')
     df_poblacion = normalizar_nombres_paises(df_poblacion, 'pais')
-    df_big_mac = normalizar_nombres_paises(df_big_mac, 'pais')
-    df_costos = normalizar_nombres_paises(df_costos, 'pais')
-    
-    if '_id' in df_big_mac.columns:
-        df_big_mac = df_big_mac.drop('_id', axis=1)
-    if '_id' in df_costos.columns:
-        df_costos = df_costos.drop('_id', axis=1)
     
     df_envejecimiento = df_envejecimiento.rename(columns={
         'poblacion': 'poblacion_env'
@@ -109,57 +268,160 @@ def preparar_dataframes(df_envejecimiento, df_poblacion, df_big_mac, df_costos):
         'poblacion': 'poblacion_pob'
     })
     
+    return df_envejecimiento, df_poblacion
+
+def preparar_dataframes(df_envejecimiento, df_poblacion, df_big_mac, df_costos, modo_expansion='columnar'):
+
+    df_envejecimiento, df_poblacion = preparar_relacionales(df_envejecimiento, df_poblacion)
+    df_big_mac = normalizar_nombres_paises(df_big_mac, 'pais')
+    df_costos = normalizar_nombres_paises(df_costos, 'pais')
+    
+    if '_id' in df_big_mac.columns:
+        df_big_mac = df_big_mac.drop('_id', axis=1)
+    if '_id' in df_costos.columns:
+        df_costos = df_costos.drop('_id', axis=1)
+    
     if 'costos' in df_costos.columns and df_costos['costos'].notna().any():
-        for registro in df_costos.itertuples():
-            if pd.notna(registro.costos) and isinstance(registro.costos, dict):
-                for clave, valor in registro.costos.items():
-                    if clave not in df_costos.columns:
-                        df_costos[clave] = None
-                    df_costos.at[registro.Index, clave] = valor
-        
-        df_costos = df_costos.drop('costos', axis=1)
+        if modo_expansion == 'iterativo':
+            df_costos = expandir_costos_iterativo(df_costos)
+        else:
+            df_costos = expandir_costos_columnar(df_costos)
     
     return df_envejecimiento, df_poblacion, df_big_mac, df_costos
 
+def preparar_documental(df_documental):
+    """Normaliza los nombres de las dos partes de las filas unidas en MongoDB y calcula su clave '_clave';
+    una fila de costos y una de Big Mac que solo coinciden por la tabla de alias (no en minúsculas)
+    se combinan aquí, sin volver a unir el resto"""
+    columna_big_mac = f'{PREFIJO_BIG_MAC}pais'
+    df = normalizar_nombres_paises(df_documental, 'pais')
+    df = normalizar_nombres_paises(df, columna_big_mac)
+    
+    # mismas columnas y orden que dejan normalizar_nombres_paises y expandir_costos_columnar por separado
+    columnas_big_mac = [col for col in df.columns if col.startswith(PREFIJO_BIG_MAC)]
+    base = [col for col in COLUMNAS_COSTOS_BASE + ['pais_norm'] if col in df.columns]
+    columnas_costos = base + [col for col in df.columns if col not in base and col not in columnas_big_mac]
+    df = df[columnas_big_mac + columnas_costos]
+    df.insert(0, '_clave', df['pais_norm'].fillna(df[f'{columna_big_mac}_norm']))
+    
+    repetidas = df['_clave'].notna() & df['_clave'].duplicated(keep=False)
+    if repetidas.any():
+        combinadas = df[repetidas].groupby('_clave', sort=False).first().reset_index()
+        print(f"- {repetidas.sum()} filas de MongoDB combinadas en {len(combinadas)} por alias de país")
+        df = pd.concat([df[~repetidas], combinadas[df.columns]], ignore_index=True)
+    
+    return df
+
+def nombres_columnas_integradas(columnas_fuentes, sufijos):
+    """Reproduce los nombres de columnas que generarían los merges encadenados con esos sufijos"""
+    nombres = [list(columnas_fuentes[0])]
+    for columnas_fuente, (sufijo_izq, sufijo_der) in zip(columnas_fuentes[1:], sufijos):
+        actuales = {col for grupo in nombres for col in grupo}
+        repetidas = actuales & set(columnas_fuente)
+        nombres = [[f"{col}{sufijo_izq}" if col in repetidas else col for col in grupo] for grupo in nombres]
+        nombres.append([f"{col}{sufijo_der}" if col in repetidas else col for col in columnas_fuente])
+    return nombres
+
+def indexar_por_pais(df, columna_clave, categorias, inicio_sin_clave):
+    """Usa el código entero del país como índice; las claves nulas quedan como filas propias con códigos
+    desde inicio_sin_clave, para que no se alineen con las de otra fuente. Devuelve (df, siguiente código libre)"""
+    codigos = categorias.get_indexer(df[columna_clave])
+    sin_clave = codigos == -1
+    siguiente = inicio_sin_clave + sin_clave.sum()
+    codigos[sin_clave] = np.arange(inicio_sin_clave, siguiente)
+    
+    df = df.set_axis(codigos, axis=0)
+    duplicados = df.index.duplicated()
+    if duplicados.any():
+        print(f"- {duplicados.sum()} filas con '{columna_clave}' repetido descartadas")
+        df = df[~duplicados]
+    return df, siguiente
+
+def indexar_fuentes(fuentes, nombres):
+    """Indexa cada fuente por el código entero de su país y le pone los nombres de columna integrados"""
+    claves = pd.concat([df[columna] for df, columna in fuentes], ignore_index=True).dropna()
+    categorias = pd.Index(np.sort(claves.unique()))
+    
+    bloques = []
+    sin_clave = len(categorias)
+    for (df, columna), nombres_fuente in zip(fuentes, nombres):
+        bloque, sin_clave = indexar_por_pais(df, columna, categorias, sin_clave)
+        bloques.append(bloque.set_axis(nombres_fuente, axis=1))
+    return bloques
+
 def integrar_datos(df_envejecimiento, df_poblacion, df_big_mac, df_costos):
     print("\nIntegrando datos")
     
-    print("Integrando datos relacionales...")
-    df_relacional = pd.merge(
-        df_envejecimiento,
-        df_poblacion,
-        left_on='nombre_pais_norm',
-        right_on='pais_norm',
-        how='outer',
-        suffixes=('_env', '_pob')
-    )
-    print(f"Datos relacionales integrados: {len(df_relacional)} registros")
+    fuentes = [
+        (df_envejecimiento, 'nombre_pais_norm'),
+        (df_poblacion, 'pais_norm'),
+        (df_big_mac, 'pais_norm'),
+        (df_costos, 'pais_norm')
+    ]
+    columnas_fuentes = [list(df.columns) for df, _ in fuentes]
+    bloques = indexar_fuentes(fuentes, nombres_columnas_integradas(columnas_fuentes, SUFIJOS_INTEGRACION))
     
+    print("Integrando datos relacionales...")
+    print(f"Datos relacionales integrados: {len(bloques[0].index.union(bloques[1].index))} registros")
     print("Integrando datos de Big Mac.")
-    df_con_big_mac = pd.merge(
-        df_relacional,
-        df_big_mac,
-        left_on='nombre_pais_norm',
-        right_on='pais_norm',
-        how='outer',
-        suffixes=('_rel', '_big_mac')
-    )
-    print(f"✓ Datos con Big Mac integrados: {len(df_con_big_mac)} registros")
-    
+    print(f"✓ Datos con Big Mac integrados: {len(bloques[0].index.union(bloques[1].index).union(bloques[2].index))} registros")
     print("Integrando datos de costos turísticos.")
-    df_integrado = pd.merge(
-        df_con_big_mac,
-        df_costos,
-        left_on='nombre_pais_norm',
-        right_on='pais_norm',
-        how='outer',
-        suffixes=('_previo', '_costos')
-    )
+    df_integrado = pd.concat(bloques, axis=1, join='outer', sort=True).reset_index(drop=True)
     print(f"✓ Todos los datos integrados: {len(df_integrado)} registros")
     
     return df_integrado
 
-def limpiar_datos_integrados(df_integrado):
+def integrar_datos_documental(df_envejecimiento, df_poblacion, df_documental):
+    """Integra las fuentes relacionales con las filas ya unidas en MongoDB (ver preparar_documental);
+    el resultado tiene las mismas columnas que integrar_datos"""
+    print("\nIntegrando datos")
+    
+    columnas_big_mac = [col for col in df_documental.columns if col.startswith(PREFIJO_BIG_MAC)]
+    columnas_costos = [col for col in df_documental.columns if col != '_clave' and col not in columnas_big_mac]
+    columnas_fuentes = [
+        list(df_envejecimiento.columns),
+        list(df_poblacion.columns),
+        [col[len(PREFIJO_BIG_MAC):] for col in columnas_big_mac],
+        columnas_costos
+    ]
+    nombres = nombres_columnas_integradas(columnas_fuentes, SUFIJOS_INTEGRACION)
+    
+    fuentes = [
+        (df_envejecimiento, 'nombre_pais_norm'),
+        (df_poblacion, 'pais_norm'),
+        (df_documental[['_clave'] + columnas_big_mac + columnas_costos], '_clave')
+    ]
+    bloques = indexar_fuentes(fuentes, nombres[:2] + [['_clave'] + nombres[2] + nombres[3]])
+    bloques[2] = bloques[2].drop(columns='_clave')
+    
+    print(f"Datos relacionales integrados: {len(bloques[0].index.union(bloques[1].index))} registros")
+    print("Integrando filas de costos turísticos y Big Mac unidas en MongoDB.")
+    df_integrado = pd.concat(bloques, axis=1, join='outer', sort=True).reset_index(drop=True)
+    print(f"✓ Todos los datos integrados: {len(df_integrado)} registros")
+    
+    return df_integrado
+
+def compactar_tipos(df, umbral_categoria=UMBRAL_CATEGORIA):
+    """Convierte textos de baja cardinalidad a category, costos a float32 e ids a int32"""
+    memoria_antes = df.memory_usage(deep=True).sum()
+    df = df.copy()
+    
+    for col in df.select_dtypes(include=['object']).columns:
+        if len(df) and df[col].nunique() / len(df) <= umbral_categoria:
+            df[col] = df[col].astype('category')
+    
+    for col in df.select_dtypes(include=['float', 'int']).columns:
+        if col.startswith('id_') and df[col].notna().all():
+            df[col] = df[col].astype('int32')
+        elif 'costo' in col or 'precio' in col:
+            df[col] = df[col].astype('float32')
+    
+    memoria_despues = df.memory_usage(deep=True).sum()
+    print(f"\nMemoria del DataFrame: {memoria_antes / 1024:,.1f} KB -> {memoria_despues / 1024:,.1f} KB "
+          f"({memoria_antes / max(memoria_despues, 1):.1f}x menos)")
+    return df
+
+def limpiar_datos_integrados(df_integrado, compacto=False):
     """Limpia y consolida los datos integrados"""
     print("\nLimpiando y consolidando datos")
     
@@ -251,6 +513,9 @@ def limpiar_datos_integrados(df_integrado):
         else:
             df_final[col] = df_final[col].fillna(0)
     
+    if compacto:
+        df_final = compactar_tipos(df_final)
+    
     print(f"\nDatos consolidados: {len(df_final)} registros con {len(df_final.columns)} columnas")
     
     print("\nColumnas del DataFrame final:")
@@ -265,89 +530,128 @@ def limpiar_datos_integrados(df_integrado):
     
     return df_final
 
-def guardar_datos_integrados(df_final):
+def guardar_datos_integrados(df_final, formatos=FORMATOS_SALIDA):
     try:
-        archivo_salida = "datos_integrados.csv"
-        df_final.to_csv(archivo_salida, index=False)
-        print(f"Datos integrados guardados en: {archivo_salida}")
+        df_final = df_final.reset_index(drop=True)
+        for formato in sorted(formatos, key=ORDEN_ESCRITURA.index):
+            archivo_salida = ARCHIVOS_SALIDA[formato]
+            if formato in ('arrow', 'parquet') and feather is None:
+                print(f"pyarrow no está instalado, se omite {archivo_salida}")
+                continue
+            
+            if formato == 'arrow':
+                feather.write_feather(df_final, archivo_salida, compression='uncompressed')
+            elif formato == 'parquet':
+                df_final.to_parquet(archivo_salida, index=False, use_dictionary=True)
+            else:
+                df_final.to_csv(archivo_salida, index=False)
+            print(f"Datos integrados guardados en: {archivo_salida}")
         return True
     except Exception as e:
         print(f"Error al guardar los datos: {e}")
         return False
     
-def mostrar_estadisticas(df_final):
+def mostrar_estadisticas(df_final, estadisticas=None):
+    estadisticas = estadisticas or calcular_estadisticas(df_final)
+    columnas = estadisticas['columnas']
+    
     print("\nEstadísticas de los datos integrados")
     
     print("\nDistribución por continente:")
-    if 'continente' in df_final.columns:
-        continentes = df_final['continente'].value_counts()
-        for continente, count in continentes.items():
-            print(f"- {continente}: {count} países")
+    for continente, count in estadisticas['grupos'].items():
+        print(f"- {continente}: {count} países")
     
-    if 'poblacion' in df_final.columns:
+    if 'poblacion' in columnas:
+        poblacion = columnas['poblacion']
         print("\nEstadísticas de población:")
-        print(f"- Población total: {df_final['poblacion'].sum():,.0f}")
-        print(f"- Población media: {df_final['poblacion'].mean():,.0f}")
-        print(f"- País más poblado: {df_final.loc[df_final['poblacion'].idxmax(), 'pais']} "
-              f"({df_final['poblacion'].max():,.0f})")
-        print(f"- País menos poblado: {df_final.loc[df_final['poblacion'].idxmin(), 'pais']} "
-              f"({df_final['poblacion'].min():,.0f})")
-    
-    if 'precio_big_mac_usd' in df_final.columns:
+        print(f"- Población total: {poblacion['suma']:,.0f}")
+        print(f"- Población media: {poblacion['media']:,.0f}")
+        print(f"- País más poblado: {poblacion['nombre_maximo']} ({poblacion['maximo']:,.0f})")
+        print(f"- País menos poblado: {poblacion['nombre_minimo']} ({poblacion['minimo']:,.0f})")
+    
+    if 'precio_big_mac_usd' in columnas:
+        big_mac = columnas['precio_big_mac_usd']
         print("\nEstadísticas de precios Big Mac:")
-        print(f"- Precio medio: ${df_final['precio_big_mac_usd'].mean():.2f}")
-        print(f"- País más caro: {df_final.loc[df_final['precio_big_mac_usd'].idxmax(), 'pais']} "
-              f"(${df_final['precio_big_mac_usd'].max():.2f})")
-        print(f"- País más barato: {df_final.loc[df_final['precio_big_mac_usd'].idxmin(), 'pais']} "
-              f"(${df_final['precio_big_mac_usd'].min():.2f})")
+        print(f"- Precio medio: ${big_mac['media']:.2f}")
+        print(f"- País más caro: {big_mac['nombre_maximo']} (${big_mac['maximo']:.2f})")
+        print(f"- País más barato: {big_mac['nombre_minimo']} (${big_mac['minimo']:.2f})")
     
-    if 'tasa_de_envejecimiento' in df_final.columns:
+    if 'tasa_de_envejecimiento' in columnas:
+        tasa = columnas['tasa_de_envejecimiento']
         print("\nEstadísticas de tasa de envejecimiento:")
-        print(f"- Tasa media: {df_final['tasa_de_envejecimiento'].mean():.2f}%")
-        print(f"- País con mayor tasa: {df_final.loc[df_final['tasa_de_envejecimiento'].idxmax(), 'pais']} "
-              f"({df_final['tasa_de_envejecimiento'].max():.2f}%)")
-        print(f"- País con menor tasa: {df_final.loc[df_final['tasa_de_envejecimiento'].idxmin(), 'pais']} "
-              f"({df_final['tasa_de_envejecimiento'].min():.2f}%)")
+        print(f"- Tasa media: {tasa['media']:.2f}%")
+        print(f"- País con mayor tasa: {tasa['nombre_maximo']} ({tasa['maximo']:.2f}%)")
+        print(f"- País con menor tasa: {tasa['nombre_minimo']} ({tasa['minimo']:.2f}%)")
 
-def main():
+def main(compacto=False, formatos=FORMATOS_SALIDA, perfilar=False, medir_memoria=False, concurrente=True, pushdown=False):
     print("Ejercicio 2.3\n")
     
-    engine_sqlite = conectar_sqlite()
+    reporte = crear_reporte('integracion', memoria=medir_memoria, perfilar=perfilar)
+    
+    with medir_etapa(reporte, 'conectar'):
+        engine_sqlite = conectar_sqlite()
+        client_mongo = conectar_mongodb() if engine_sqlite else None
     if not engine_sqlite:
         print("No se pudo conectar a SQL")
         return
-    
-    client_mongo = conectar_mongodb()
     if not client_mongo:
         print("No se pudo conectar a MongoDB")
         return
     
-    df_envejecimiento, df_poblacion = extraer_datos_relacionales(engine_sqlite)
-    if df_envejecimiento is None or df_poblacion is None:
-        print("Error al extraer datos relacionales.")
+    with medir_etapa(reporte, 'extraer') as etapa:
+        fuentes = extraer_fuentes(engine_sqlite, client_mongo, concurrente, pushdown)
+        etapa['filas_salida'] = contar_filas(*fuentes) if fuentes else 0
+    if fuentes is None:
+        print("Error al extraer las fuentes de datos.")
         return
     
-    df_big_mac, df_costos = extraer_datos_mongodb(client_mongo)
-    if df_big_mac is None or df_costos is None:
-        print("Error al extraer datos de MongoDB.")
-        return
-    
-    df_envejecimiento, df_poblacion, df_big_mac, df_costos = preparar_dataframes(
-        df_envejecimiento, df_poblacion, df_big_mac, df_costos
-    )
+    with medir_etapa(reporte, 'preparar', etapa['filas_salida']) as etapa:
+        if pushdown:
+            df_envejecimiento, df_poblacion, df_documental = fuentes
+            df_envejecimiento, df_poblacion = preparar_relacionales(df_envejecimiento, df_poblacion)
+            fuentes = (df_envejecimiento, df_poblacion, preparar_documental(df_documental))
+        else:
+            fuentes = preparar_dataframes(*fuentes)
+        etapa['filas_salida'] = contar_filas(*fuentes)
     
-    df_integrado = integrar_datos(df_envejecimiento, df_poblacion, df_big_mac, df_costos)
+    with medir_etapa(reporte, 'integrar', etapa['filas_salida']) as etapa:
+        df_integrado = integrar_datos_documental(*fuentes) if pushdown else integrar_datos(*fuentes)
+        etapa['filas_salida'] = len(df_integrado)
     
-    df_final = limpiar_datos_integrados(df_integrado)
+    with medir_etapa(reporte, 'limpiar', len(df_integrado)) as etapa:
+        df_final = limpiar_datos_integrados(df_integrado, compacto)
+        etapa['filas_salida'] = len(df_final)
     
-    guardar_datos_integrados(df_final)
+    with medir_etapa(reporte, 'guardar', len(df_final)) as etapa:
+        guardar_datos_integrados(df_final, formatos)
+        etapa['filas_salida'] = len(df_final)
     
-    mostrar_estadisticas(df_final)
+    with medir_etapa(reporte, 'estadisticas', len(df_final)):
+        estadisticas = calcular_estadisticas(df_final)
+        guardar_estadisticas(estadisticas, ARCHIVO_ESTADISTICAS)
+        mostrar_estadisticas(df_final, estadisticas)
     
     engine_sqlite.dispose()
     client_mongo.close()
     
+    imprimir_reporte(reporte)
+    print(f"Reporte de la ejecución guardado en: {guardar_reporte(reporte)}")
+    
     print("\nIntegracion completada.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Integración de datos relacionales y de MongoDB")
+    parser.add_argument('--compacto', action='store_true',
+                        help="Usa category, float32 e int32 para reducir la memoria del DataFrame final")
+    parser.add_argument('--formatos', nargs='+', choices=list(ARCHIVOS_SALIDA), default=list(FORMATOS_SALIDA),
+                        help="Formatos en los que se guardan los datos integrados")
+    parser.add_argument('--perfilar', action='store_true',
+                        help="Guarda un volcado de cProfile de la etapa más lenta")
+    parser.add_argument('--memoria', action='store_true',
+                        help="Mide la memoria por etapa con tracemalloc (agrega bastante sobrecarga)")
+    parser.add_argument('--secuencial', action='store_true',
+                        help="Extrae las cuatro fuentes una tras otra en lugar de concurrentemente")
+    parser.add_argument('--pushdown', action='store_true',
+                        help="Aplana costos y une big_mac_index con un pipeline de agregación en MongoDB")
+    args = parser.parse_args()
+    main(args.compacto, args.formatos, args.perfilar, args.memoria, not args.secuencial, args.pushdown)
@@ -1,8 +1,20 @@
-import json
+import argparse
+import io
+import math
 import os
-from pymongo import MongoClient
+import queue
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import lru_cache
+from itertools import chain, islice
+from multiprocessing import Manager
+from operator import itemgetter
+from pymongo import MongoClient, InsertOne, ReplaceOne
 from dotenv import load_dotenv
-import pandas as pd
+from lector_json import iterar_elementos
+from limpieza import constante
 
 load_dotenv()
 
@@ -14,6 +26,23 @@ json_files = [
     'costos_turisticos_europa.json'
 ]
 
+COLECCIONES = {
+    'big_mac_index': ['paises_mundo_big_mac.json'],
+    'costos_turisticos': [archivo for archivo in json_files if archivo.startswith('costos_turisticos_')]
+}
+
+TAMANO_LOTE_MONGO = 1000
+
+# las políticas son constantes, así que cada lote se rellena sin mirar el resto de los datos
+POLITICAS_NULOS = {
+    'pais': constante('Desconocido'),
+    'continente': constante('Desconocido'),
+    'capital': constante('Desconocido'),
+    'region': constante('Desconocido'),
+    'poblacion': constante(0),
+    'precio_big_mac_usd': constante(0)
+}
+
 def conectar_mongodb():
     MONGO_URI = os.getenv("MONGO_URI", "mongodb+srv://giovannisantos1890:<>@cluster0.vqry3kh.mongodb.net/")
     
@@ -26,23 +55,32 @@ def conectar_mongodb():
         print(f"Error al conectar con MongoDB Atlas: {e}")
         return None
 
-def cargar_json(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            print(f"Archivo cargado: {file_path}")
-            return data
-    except Exception as e:
-        print(f"Error al cargar el archivo {file_path}: {e}")
-        return None
+def nuevo_resumen():
+    return {'registros': 0, 'muestra': None, 'clave_pais': None, 'paises': set(), 'continentes': set()}
 
-def analizar_datos(data, file_name):
-    if not data:
+def resumir_documentos(documentos, resumen):
+    """Deja pasar los documentos acumulando en resumen lo que muestra imprimir_analisis"""
+    for item in documentos:
+        if resumen['muestra'] is None:
+            resumen['muestra'] = item
+            if 'país' in item or 'pais' in item:
+                resumen['clave_pais'] = 'país' if 'país' in item else 'pais'
+        resumen['registros'] += 1
+        
+        clave_pais = resumen['clave_pais']
+        if clave_pais and clave_pais in item:
+            resumen['paises'].add(item[clave_pais])
+        if 'continente' in resumen['muestra'] and 'continente' in item:
+            resumen['continentes'].add(item['continente'])
+        yield item
+
+def imprimir_analisis(resumen, file_name):
+    if not resumen['registros']:
         return
     print(f"\nAnálisis de {file_name} ---")
-    print(f"Número de registros: {len(data)}")
+    print(f"Número de registros: {resumen['registros']}")
     
-    muestra = data[0] if data else {}
+    muestra = resumen['muestra']
     
     print("\nEstructura del documento:")
     for key, value in muestra.items():
@@ -51,112 +89,262 @@ def analizar_datos(data, file_name):
         else:
             print(f"- {key}: {type(value).__name__}")
     
-    if 'país' in muestra or 'pais' in muestra:
-        key_pais = 'país' if 'país' in muestra else 'pais'
-        paises = [item[key_pais] for item in data if key_pais in item]
-        print(f"\nPaíses representados: {len(set(paises))}")
-        print(f"Ejemplos: {', '.join(list(set(paises))[:5])}")
+    if resumen['clave_pais']:
+        paises = resumen['paises']
+        print(f"\nPaíses representados: {len(paises)}")
+        print(f"Ejemplos: {', '.join(list(paises)[:5])}")
     
     if 'continente' in muestra:
-        continentes = [item['continente'] for item in data if 'continente' in item]
-        print(f"\nContinentes representados: {', '.join(set(continentes))}")
+        print(f"\nContinentes representados: {', '.join(resumen['continentes'])}")
+
+def aplanar_costos_generico(costos_data):
+    costos = {}
+    for categoria, valores in costos_data.items():
+        if isinstance(valores, dict):
+            for tipo, valor in valores.items():
+                costos[f"{categoria}_{tipo}"] = valor
+        else:
+            costos[categoria] = valores
+    return costos
+
+def forma_costos(costos_data):
+    if not all(isinstance(valores, dict) for valores in costos_data.values()):
+        return None
+    return tuple((categoria, tuple(valores)) for categoria, valores in costos_data.items())
+
+@lru_cache(maxsize=32)
+def compilar_aplanador(forma):
+    """Claves planas y un itemgetter por categoría, calculados una vez por forma de documento"""
+    lectores = []
+    for categoria, tipos in forma:
+        if len(tipos) == 1:
+            lector = (lambda valores, tipo=tipos[0]: (valores[tipo],))
+        elif tipos:
+            lector = itemgetter(*tipos)
+        else:
+            lector = (lambda valores: ())
+        lectores.append((categoria, lector))
+    claves = tuple(f"{categoria}_{tipo}" for categoria, tipos in forma for tipo in tipos)
+    categorias = frozenset(categoria for categoria, _ in forma)
+    return categorias, tuple(lectores), claves
+
+def aplanar_costos(costos_data, aplanador=None):
+    """Aplana con el aplanador compilado del documento anterior y solo recompila si el documento cambia de forma;
+    devuelve (costos planos, aplanador para el siguiente documento)"""
+    if aplanador is not None:
+        categorias, lectores, claves = aplanador
+        try:
+            # con todas las claves esperadas presentes, igual cantidad de hojas implica que no sobra ninguna
+            if costos_data.keys() == categorias and sum(map(len, costos_data.values())) == len(claves):
+                valores = chain.from_iterable([lector(costos_data[c]) for c, lector in lectores])
+                return dict(zip(claves, valores)), aplanador
+        except (KeyError, TypeError):
+            pass
     
-    return
+    forma = forma_costos(costos_data)
+    if forma is None:
+        return aplanar_costos_generico(costos_data), aplanador
+    return aplanar_costos_generico(costos_data), compilar_aplanador(forma)
 
-def unificar_estructura(data, file_name):
-    if not data:
-        return []
+def unificar_documento(item, file_name, aplanador=None):
+    """Devuelve (documento unificado, aplanador de costos para el siguiente documento del archivo)"""
+    if file_name == 'paises_mundo_big_mac.json':
+        return {
+            'pais': item.get('país', ''),
+            'continente': item.get('continente', ''),
+            'precio_big_mac_usd': item.get('precio_big_mac_usd', 0),
+            'tipo_dato': 'big_mac'
+        }, aplanador
     
-    resultado = []
+    costos = {}
+    if 'costos_diarios_estimados_en_dólares' in item:
+        costos, aplanador = aplanar_costos(item['costos_diarios_estimados_en_dólares'], aplanador)
     
-    if file_name == 'paises_mundo_big_mac.json':
-        for item in data:
-            nuevo_item = {
-                'pais': item.get('país', ''),
-                'continente': item.get('continente', ''),
-                'precio_big_mac_usd': item.get('precio_big_mac_usd', 0),
-                'tipo_dato': 'big_mac'
-            }
-            resultado.append(nuevo_item)
-    else:
-        for item in data:
-            costos = {}
-            if 'costos_diarios_estimados_en_dólares' in item:
-                costos_data = item['costos_diarios_estimados_en_dólares']
-                
-                for categoria, valores in costos_data.items():
-                    if isinstance(valores, dict):
-                        for tipo, valor in valores.items():
-                            costos[f"{categoria}_{tipo}"] = valor
-                    else:
-                        costos[categoria] = valores
-            
-            nuevo_item = {
-                'pais': item.get('país', item.get('pais', '')),
-                'continente': item.get('continente', ''),
-                'poblacion': item.get('población', item.get('poblacion', 0)),
-                'capital': item.get('capital', ''),
-                'region': item.get('región', item.get('region', '')),
-                'costos': costos,
-                'tipo_dato': 'costos_turisticos',
-                'fuente': file_name
-            }
-            resultado.append(nuevo_item)
-    
-    print(f"Estructura unificada para {file_name}: {len(resultado)} registros")
-    return resultado
-
-def verificar_valores_nulos(data):
-    if not data:
-        return data
-    
-    df = pd.DataFrame(data)
-    
-    nulos = df.isnull().sum()
-    if nulos.sum() > 0:
-        print("\nValores nulos encontrados:")
-        print(nulos[nulos > 0])
-        
-        print("\nRealizando limpieza de valores nulos...")
-        
-        df_limpio = df.fillna({
-            'pais': 'Desconocido',
-            'continente': 'Desconocido',
-            'capital': 'Desconocido',
-            'region': 'Desconocido'
-        })
-        
-        for col in df.select_dtypes(include=['float64', 'int64']).columns:
-            df_limpio[col] = df_limpio[col].fillna(0)
-        
-        return df_limpio.to_dict('records')
+    return {
+        'pais': item.get('país', item.get('pais', '')),
+        'continente': item.get('continente', ''),
+        'poblacion': item.get('población', item.get('poblacion', 0)),
+        'capital': item.get('capital', ''),
+        'region': item.get('región', item.get('region', '')),
+        'costos': costos,
+        'tipo_dato': 'costos_turisticos',
+        'fuente': file_name
+    }, aplanador
+
+def unificar_documentos(documentos, file_name):
+    """Unifica los documentos de un archivo pasando de uno al siguiente el aplanador compilado"""
+    aplanador = None
+    for item in documentos:
+        documento, aplanador = unificar_documento(item, file_name, aplanador)
+        yield documento
+
+def dividir_en_lotes(documentos, tamano_lote):
+    documentos = iter(documentos)
+    while True:
+        lote = list(islice(documentos, tamano_lote))
+        if not lote:
+            return
+        yield lote
+
+def lotes_archivo(file_name, tamano_lote):
+    """Lee el archivo en streaming y entrega los documentos unificados en lotes de tamano_lote,
+    sin tener en memoria el árbol JSON ni la lista completa de documentos"""
+    resumen = nuevo_resumen()
+    try:
+        documentos = resumir_documentos(iterar_elementos(file_name), resumen)
+        yield from dividir_en_lotes(unificar_documentos(documentos, file_name), tamano_lote)
+        print(f"Archivo cargado: {file_name}")
+    except Exception as e:
+        print(f"Error al cargar el archivo {file_name}: {e}")
+    if resumen['registros']:
+        imprimir_analisis(resumen, file_name)
+        print(f"Estructura unificada para {file_name}: {resumen['registros']} registros")
+
+def producir_lotes(file_name, tamano_lote, cola, detener):
+    """Proceso trabajador: envía por la cola (archivo, lote, None) y termina con (archivo, None, salida impresa)"""
+    salida = io.StringIO()
+    try:
+        with redirect_stdout(salida):
+            for lote in lotes_archivo(file_name, tamano_lote):
+                if detener.is_set():
+                    return
+                cola.put((file_name, lote, None))
+    finally:
+        cola.put((file_name, None, salida.getvalue()))
+
+def ingerir_archivos(archivos, tamano_lote=TAMANO_LOTE_MONGO, paralelo=True, max_workers=None):
+    """Lotes de documentos unificados de todos los archivos; en paralelo cada archivo se decodifica en su
+    proceso y los lotes llegan por una cola acotada, así solo hay unos pocos lotes en memoria a la vez"""
+    if not paralelo or len(archivos) < 2:
+        for file_name in archivos:
+            yield from lotes_archivo(file_name, tamano_lote)
+        return
     
-    return data
+    max_workers = max_workers or min(len(archivos), os.cpu_count() or 1)
+    with Manager() as manager, ProcessPoolExecutor(max_workers=max_workers) as executor:
+        cola = manager.Queue(maxsize=2 * max_workers)
+        detener = manager.Event()
+        futuros = [executor.submit(producir_lotes, file_name, tamano_lote, cola, detener) for file_name in archivos]
+        pendientes = len(futuros)
+        try:
+            while pendientes:
+                _, lote, salida = cola.get()
+                if lote is None:
+                    print(salida, end='')
+                    pendientes -= 1
+                else:
+                    yield lote
+        finally:
+            if pendientes:
+                # si se deja de consumir, los trabajadores se detienen y la cola se vacía para que ninguno quede en put
+                detener.set()
+                for futuro in futuros:
+                    futuro.cancel()
+                while not all(futuro.done() for futuro in futuros):
+                    try:
+                        cola.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+        for futuro in futuros:
+            futuro.result()
+
+def es_nulo(valor):
+    return valor is None or (isinstance(valor, float) and math.isnan(valor))
 
-def cargar_en_mongodb(client, data, collection_name):
-    if not client or not data:
+def verificar_valores_nulos(lotes):
+    """Rellena en cada lote solo las celdas nulas con las políticas constantes y al terminar informa cuántas hubo"""
+    nulos = Counter()
+    for lote in lotes:
+        for doc in lote:
+            for col, (_, valor) in POLITICAS_NULOS.items():
+                if col in doc and es_nulo(doc[col]):
+                    doc[col] = valor
+                    nulos[col] += 1
+        yield lote
+    
+    if nulos:
+        print("\nValores nulos encontrados y rellenados:")
+        for col, cantidad in nulos.items():
+            print(f"  - {cantidad} valores nulos en '{col}' rellenados con '{POLITICAS_NULOS[col][1]}'")
+
+def escribir_lote(collection, operaciones, numero):
+    inicio = time.perf_counter()
+    result = collection.bulk_write(operaciones, ordered=False)
+    duracion = time.perf_counter() - inicio
+    
+    escritos = result.inserted_count + result.upserted_count + result.modified_count
+    velocidad = len(operaciones) / duracion if duracion > 0 else float('inf')
+    print(f"  - Lote {numero}: {escritos} documentos escritos en {duracion:.3f}s ({velocidad:,.0f} docs/s)")
+    return escritos
+
+def crear_indices(collection):
+    collection.create_index("pais")
+    collection.create_index("continente")
+
+def cargar_reemplazo(db, lotes, collection_name):
+    staging_name = f"{collection_name}_staging"
+    staging = db[staging_name]
+    staging.drop()
+    
+    total = 0
+    for numero, lote in enumerate(lotes, start=1):
+        total += escribir_lote(staging, [InsertOne(doc) for doc in lote], numero)
+    if not total:
+        staging.drop()
+        print(f"No hay documentos para cargar en {collection_name}; se conserva la colección actual.")
+        return total
+    crear_indices(staging)
+    
+    staging.rename(collection_name, dropTarget=True)
+    print(f"✓ {total} documentos cargados en {staging_name} y renombrada a {collection_name}.")
+    print(f"Indices creados en 'pais' y 'continente' para la colección {collection_name}.")
+    return total
+
+def cargar_incremental(db, lotes, collection_name):
+    collection = db[collection_name]
+    # el índice se crea antes de escribir para que cada upsert busque por 'pais' sin recorrer la colección
+    crear_indices(collection)
+    
+    total = omitidos = 0
+    for numero, lote in enumerate(lotes, start=1):
+        paises = [doc.get('pais') for doc in lote]
+        existentes = {doc['pais']: doc for doc in collection.find({'pais': {'$in': paises}}, {'_id': 0})}
+        # se reemplaza el documento completo para que desaparezcan los campos quitados de la fuente
+        operaciones = [ReplaceOne({'pais': doc.get('pais')}, doc, upsert=True)
+                       for doc in lote if existentes.get(doc.get('pais')) != doc]
+        omitidos += len(lote) - len(operaciones)
+        if operaciones:
+            total += escribir_lote(collection, operaciones, numero)
+    
+    print(f"- {omitidos} documentos sin cambios omitidos.")
+    print(f"✓ {total} documentos insertados o actualizados en la colección {collection_name}.")
+    return total
+
+def cargar_en_mongodb(client, lotes, collection_name, modo='reemplazo'):
+    """Consume los lotes a medida que llegan; ninguna etapa junta la colección completa en memoria"""
+    if not client:
         return False
     
     try:
         db = client['paisesDB']
-        collection = db[collection_name]
-        
-        result = collection.delete_many({})
-        if result.deleted_count > 0:
-            print(f"- {result.deleted_count} documentos eliminados de la colección existente.")
         
-        result = collection.insert_many(data)
-        print(f"✓ {len(result.inserted_ids)} documentos insertados en la colección {collection_name}.")
-        
-        collection.create_index("pais")
-        collection.create_index("continente")
-        print(f"Indices creados en 'pais' y 'continente' para la colección {collection_name}.")
+        if modo == 'incremental':
+            cargar_incremental(db, lotes, collection_name)
+        else:
+            cargar_reemplazo(db, lotes, collection_name)
         
         return True
     except Exception as e:
         print(f"Error al cargar datos: {e}")
         return False
 
+def cargar_colecciones(client, modo='reemplazo', paralelo=True, tamano_lote=TAMANO_LOTE_MONGO):
+    """Lee, limpia y escribe cada colección lote a lote"""
+    for collection_name, archivos in COLECCIONES.items():
+        print(f"\n--- Cargando {collection_name} en MongoDB ---")
+        lotes = verificar_valores_nulos(ingerir_archivos(archivos, tamano_lote, paralelo))
+        cargar_en_mongodb(client, lotes, collection_name, modo)
+
 def realizar_consultas_prueba(client):
     if not client:
         return
@@ -189,7 +377,7 @@ def realizar_consultas_prueba(client):
     print(f"\nPaíses presentes en ambas colecciones: {len(paises_comunes)}")
     print(f"Ejemplos: {', '.join(list(paises_comunes)[:5])}")
 
-def main():
+def main(modo='reemplazo'):
     print("Ejercicio 2.2\n")
     
     client = conectar_mongodb()
@@ -197,27 +385,7 @@ def main():
         print("No se pudo conectar con MongoDB. Abortando.")
         return
     
-    datos_big_mac = []
-    datos_costos = []
-    
-    for file_name in json_files:
-        data = cargar_json(file_name)
-        if data:
-            analizar_datos(data, file_name)
-            
-            datos_unificados = unificar_estructura(data, file_name)
-            
-            if file_name == 'paises_mundo_big_mac.json':
-                datos_big_mac.extend(datos_unificados)
-            else:
-                datos_costos.extend(datos_unificados)
-    
-    datos_big_mac = verificar_valores_nulos(datos_big_mac)
-    datos_costos = verificar_valores_nulos(datos_costos)
-    
-    print("\n--- Cargando datos en MongoDB ---")
-    cargar_en_mongodb(client, datos_big_mac, 'big_mac_index')
-    cargar_en_mongodb(client, datos_costos, 'costos_turisticos')
+    cargar_colecciones(client, modo)
     
     realizar_consultas_prueba(client)
     
@@ -225,4 +393,8 @@ def main():
     print("\Proceso completado.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Carga en MongoDB los archivos JSON de Big Mac y costos turísticos")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Reemplaza por 'pais' solo los documentos que cambiaron en lugar de recargar las colecciones")
+    args = parser.parse_args()
+    main('incremental' if args.incremental else 'reemplazo')
@@ -1,10 +1,51 @@
+import argparse
+import time
 import pandas as pd
 import sqlite3
 import os
+from huellas import detectar_cambios
+from limpieza import limpiar_nulos, describir_rellenos, constante, MEDIA
 
-def crear_base_datos():
-    db_path = 'datos_paises.db'
-    
+DB_PATH = 'datos_paises.db'
+
+FUENTES_CSV = {
+    'pais_envejecimiento': 'pais_envejecimiento.csv',
+    'pais_poblacion': 'pais_poblacion.csv'
+}
+
+POLITICAS_NULOS = {
+    'pais_envejecimiento': {
+        'capital': constante('Desconocido'),
+        'continente': constante('Desconocido'),
+        'region': constante('Desconocido'),
+        'poblacion': MEDIA,
+        'tasa_de_envejecimiento': MEDIA
+    },
+    'pais_poblacion': {
+        '_id': constante('Desconocido'),
+        'continente': constante('Desconocido'),
+        'pais': constante('Desconocido'),
+        'poblacion': MEDIA,
+        'costo_bajo_hospedaje': MEDIA,
+        'costo_promedio_comida': MEDIA,
+        'costo_bajo_transporte': MEDIA,
+        'costo_promedio_entretenimiento': MEDIA
+    }
+}
+
+PERFIL_CARGA = {
+    'journal_mode': 'WAL',
+    'synchronous': 'OFF',
+    'cache_size': -200000,
+    'temp_store': 'MEMORY'
+}
+
+PERFIL_NORMAL = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'NORMAL'
+}
+
+def crear_base_datos(db_path=DB_PATH):
     if os.path.exists(db_path):
         os.remove(db_path)
         print(f"Base de datos anterior eliminada: {db_path}")
@@ -41,62 +82,119 @@ def crear_tablas(conn, cursor):
     )
     ''')
     
+    cursor.execute('''
+    CREATE TABLE huellas_fuentes (
+        archivo TEXT PRIMARY KEY,
+        tamano INTEGER,
+        mtime_ns INTEGER,
+        algoritmo TEXT,
+        hash TEXT
+    )
+    ''')
+    
     conn.commit()
-    print("Tablas creadas: pais_envejecimiento, pais_poblacion")
+    print("Tablas creadas: pais_envejecimiento, pais_poblacion, huellas_fuentes")
 
-def cargar_datos(conn, cursor):
+def leer_huellas(db_path=DB_PATH):
+    """Huellas de los CSV con los que se cargó la base existente; vacío si no hay base o no tiene huellas"""
+    if not os.path.exists(db_path):
+        return {}
+    conn = sqlite3.connect(db_path)
     try:
-        df_envejecimiento = pd.read_csv('pais_envejecimiento.csv')
-        df_poblacion = pd.read_csv('pais_poblacion.csv')
-        
+        filas = conn.execute("SELECT archivo, tamano, mtime_ns, algoritmo, hash FROM huellas_fuentes").fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    finally:
+        conn.close()
+    columnas = ['archivo', 'tamano', 'mtime_ns', 'algoritmo', 'hash']
+    return {fila[0]: dict(zip(columnas, fila)) for fila in filas}
+
+def guardar_huellas(conn, cursor, huellas):
+    with conn:
+        cursor.executemany(
+            "INSERT OR REPLACE INTO huellas_fuentes (archivo, tamano, mtime_ns, algoritmo, hash) "
+            "VALUES (:archivo, :tamano, :mtime_ns, :algoritmo, :hash)",
+            huellas
+        )
+
+def aplicar_pragmas(cursor, perfil):
+    for pragma, valor in perfil.items():
+        cursor.execute(f"PRAGMA {pragma} = {valor}")
+
+def insertar_dataframe(conn, cursor, df, tabla, modo='bulk', vaciar=False):
+    """Inserta df en una tabla ya creada sin reemplazar su esquema y devuelve las filas por segundo;
+    con vaciar borra antes las filas existentes en la misma transacción que la inserción"""
+    inicio = time.perf_counter()
+    
+    if modo == 'to_sql':
+        # si to_sql falla el rollback también deshace el DELETE
+        with conn:
+            if vaciar:
+                cursor.execute(f'DELETE FROM "{tabla}"')
+            df.to_sql(tabla, conn, if_exists='append', index=False)
+    else:
+        columnas = ', '.join(f'"{col}"' for col in df.columns)
+        marcadores = ', '.join('?' for _ in df.columns)
+        filas = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        with conn:
+            if vaciar:
+                cursor.execute(f'DELETE FROM "{tabla}"')
+            cursor.executemany(f'INSERT INTO "{tabla}" ({columnas}) VALUES ({marcadores})', filas)
+    
+    duracion = time.perf_counter() - inicio
+    velocidad = len(df) / duracion if duracion > 0 else float('inf')
+    print(f"  - {tabla}: {len(df)} filas en {duracion:.3f}s ({velocidad:,.0f} filas/s, modo {modo})")
+    return velocidad
+
+def cargar_datos(conn, cursor, modo='bulk', tablas=None, vaciar=False):
+    """Carga desde CSV las tablas indicadas (todas por defecto); devuelve True si la carga terminó"""
+    tablas = list(FUENTES_CSV) if tablas is None else tablas
+    try:
+        df_envejecimiento = df_poblacion = None
         print("\nDatos cargados desde CSV:")
-        print(f"- pais_envejecimiento: {len(df_envejecimiento)} registros")
-        print(f"- pais_poblacion: {len(df_poblacion)} registros")
-        
-        nulos_env = df_envejecimiento.isnull().sum()
-        nulos_pob = df_poblacion.isnull().sum()
+        if 'pais_envejecimiento' in tablas:
+            df_envejecimiento = pd.read_csv(FUENTES_CSV['pais_envejecimiento'])
+            print(f"- pais_envejecimiento: {len(df_envejecimiento)} registros")
+        if 'pais_poblacion' in tablas:
+            df_poblacion = pd.read_csv(FUENTES_CSV['pais_poblacion'])
+            print(f"- pais_poblacion: {len(df_poblacion)} registros")
         
-        print("\nAnálisis de valores nulos en pais_envejecimiento:")
-        print(nulos_env)
+        if df_envejecimiento is not None:
+            df_envejecimiento, nulos_env, rellenos_env = limpiar_nulos(df_envejecimiento, POLITICAS_NULOS['pais_envejecimiento'])
+            print("\nAnálisis de valores nulos en pais_envejecimiento:")
+            print(nulos_env)
         
-        print("\nAnálisis de valores nulos en pais_poblacion:")
-        print(nulos_pob)
+        if df_poblacion is not None:
+            df_poblacion, nulos_pob, rellenos_pob = limpiar_nulos(df_poblacion, POLITICAS_NULOS['pais_poblacion'])
+            print("\nAnálisis de valores nulos en pais_poblacion:")
+            print(nulos_pob)
         
-        if nulos_env.sum() > 0:
+        if df_envejecimiento is not None and nulos_env.sum() > 0:
             print("\nLimpiando valores nulos en pais_envejecimiento...")
-            for col in ['capital', 'continente', 'region']:
-                if nulos_env[col] > 0:
-                    df_envejecimiento[col] = df_envejecimiento[col].fillna('Desconocido')
-                    print(f"  - {nulos_env[col]} valores nulos en '{col}' rellenados con 'Desconocido'")
-            
-            for col in ['poblacion', 'tasa_de_envejecimiento']:
-                if nulos_env[col] > 0:
-                    media = df_envejecimiento[col].mean()
-                    df_envejecimiento[col] = df_envejecimiento[col].fillna(media)
-                    print(f"  - {nulos_env[col]} valores nulos en '{col}' rellenados con la media: {media:.2f}")
+            describir_rellenos(rellenos_env)
         
-        if nulos_pob.sum() > 0:
+        if df_poblacion is not None and nulos_pob.sum() > 0:
             print("\nLimpiando valores nulos en pais_poblacion...")
-            for col in ['_id', 'continente', 'pais']:
-                if nulos_pob[col] > 0:
-                    df_poblacion[col] = df_poblacion[col].fillna('Desconocido')
-                    print(f"  - {nulos_pob[col]} valores nulos en '{col}' rellenados con 'Desconocido'")
-            
-            cols_num = ['poblacion', 'costo_bajo_hospedaje', 'costo_promedio_comida', 
-                         'costo_bajo_transporte', 'costo_promedio_entretenimiento']
-            for col in cols_num:
-                if nulos_pob[col] > 0:
-                    media = df_poblacion[col].mean()
-                    df_poblacion[col] = df_poblacion[col].fillna(media)
-                    print(f"  - {nulos_pob[col]} valores nulos en '{col}' rellenados con la media: {media:.2f}")
+            describir_rellenos(rellenos_pob)
+        
+        print("\nInsertando en SQLite:")
+        if modo == 'bulk':
+            aplicar_pragmas(cursor, PERFIL_CARGA)
         
-        df_envejecimiento.to_sql('pais_envejecimiento', conn, if_exists='replace', index=False)
-        df_poblacion.to_sql('pais_poblacion', conn, if_exists='replace', index=False)
+        if df_envejecimiento is not None:
+            insertar_dataframe(conn, cursor, df_envejecimiento, 'pais_envejecimiento', modo, vaciar)
+        if df_poblacion is not None:
+            insertar_dataframe(conn, cursor, df_poblacion, 'pais_poblacion', modo, vaciar)
+        
+        if modo == 'bulk':
+            aplicar_pragmas(cursor, PERFIL_NORMAL)
         
         print("\nDatos cargados en la base de datos SQLite.")
+        return True
         
     except Exception as e:
         print(f"Error al cargar los datos: {e}")
+        return False
 
 def verificar_carga(cursor):
     print("\nVerificando datos cargados:")
@@ -124,14 +222,43 @@ def verificar_carga(cursor):
         print(row)
 
 
-def main():
+def main(modo='bulk', forzar=False):
     print("Creacion de base de datos\n")
     
-    conn, cursor = crear_base_datos()
+    anteriores = {} if forzar else leer_huellas()
+    tablas, huellas = [], []
+    for tabla, archivo in FUENTES_CSV.items():
+        try:
+            cambiados, huella = detectar_cambios([archivo], anteriores)
+        except FileNotFoundError:
+            print(f"No se encontró {archivo}; se omite la tabla {tabla}")
+            continue
+        huellas.extend(huella)
+        if cambiados:
+            tablas.append(tabla)
+    
+    if not huellas:
+        print("No hay archivos CSV para cargar")
+        return
+    
+    if not tablas:
+        conn = sqlite3.connect(DB_PATH)
+        guardar_huellas(conn, conn.cursor(), huellas)
+        conn.close()
+        print(f"Los CSV no cambiaron desde la última carga; se conserva {DB_PATH}")
+        return
     
-    crear_tablas(conn, cursor)
+    recarga_parcial = bool(anteriores)
+    if recarga_parcial:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        print(f"Recargando solo las tablas con CSV modificado: {', '.join(tablas)}")
+    else:
+        conn, cursor = crear_base_datos()
+        crear_tablas(conn, cursor)
     
-    cargar_datos(conn, cursor)
+    if cargar_datos(conn, cursor, modo, tablas, vaciar=recarga_parcial):
+        guardar_huellas(conn, cursor, huellas)
     
     verificar_carga(cursor)
         
@@ -140,4 +267,10 @@ def main():
     print(f"Base de datos creada")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Creación de la base de datos relacional")
+    parser.add_argument('--modo', choices=['bulk', 'to_sql'], default='bulk',
+                        help="bulk: executemany en una transacción con pragmas de carga; to_sql: DataFrame.to_sql")
+    parser.add_argument('--forzar', action='store_true',
+                        help="Reconstruye la base aunque los CSV no hayan cambiado")
+    args = parser.parse_args()
+    main(args.modo, args.forzar)
\ No newline at end of file
@@ -1,12 +1,138 @@
+import argparse
+import numpy as np
 import pandas as pd
 import sqlite3
 import os
 from datetime import datetime
 
-def crear_datawarehouse():
-    db_path = 'data_warehouse.db'
-    
-    if os.path.exists(db_path):
+try:
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    feather = None
+
+TIPO_SCD = 2
+
+COLUMNAS_DIM_PAIS = [
+    'id_pais_origen', 'pais', 'capital', 'continente', 'region', 'poblacion', 'tasa_de_envejecimiento'
+]
+
+COLUMNAS_COSTOS = {
+    'precio_big_mac_usd': 'big_mac',
+    'costo_bajo_hospedaje': 'hospedaje',
+    'costo_promedio_comida': 'comida',
+    'costo_bajo_transporte': 'transporte',
+    'costo_promedio_entretenimiento': 'entretenimiento'
+}
+
+CONSULTAS = {
+    'top_big_mac': '''
+    SELECT p.pais, p.continente, f.valor
+    FROM fact_economicos f
+    JOIN dim_pais p ON f.id_pais = p.id_pais
+    JOIN dim_costos c ON f.id_costo = c.id_costo
+    WHERE f.vigente = 1 AND c.tipo_costo = 'big_mac'
+    ORDER BY f.valor DESC
+    LIMIT ?
+    ''',
+    'hospedaje_continente': '''
+    SELECT p.continente, AVG(f.valor) as promedio
+    FROM fact_economicos f
+    JOIN dim_pais p ON f.id_pais = p.id_pais
+    JOIN dim_costos c ON f.id_costo = c.id_costo
+    WHERE f.vigente = 1 AND c.tipo_costo = 'hospedaje'
+    GROUP BY p.continente
+    ORDER BY promedio DESC
+    ''',
+    'big_mac_envejecimiento': '''
+    SELECT p.pais, p.continente, f.valor as precio_big_mac, p.tasa_de_envejecimiento
+    FROM fact_economicos f
+    JOIN dim_pais p ON f.id_pais = p.id_pais
+    JOIN dim_costos c ON f.id_costo = c.id_costo
+    WHERE f.vigente = 1 AND c.tipo_costo = 'big_mac'
+    ORDER BY f.valor DESC
+    LIMIT 10
+    ''',
+    'costos_continente': '''
+    SELECT 
+        p.continente,
+        avg(CASE WHEN c.tipo_costo = 'hospedaje' THEN f.valor ELSE NULL END) as avg_hospedaje,
+        avg(CASE WHEN c.tipo_costo = 'comida' THEN f.valor ELSE NULL END) as avg_comida,
+        avg(CASE WHEN c.tipo_costo = 'transporte' THEN f.valor ELSE NULL END) as avg_transporte,
+        avg(CASE WHEN c.tipo_costo = 'entretenimiento' THEN f.valor ELSE NULL END) as avg_entretenimiento
+    FROM fact_economicos f
+    JOIN dim_pais p ON f.id_pais = p.id_pais
+    JOIN dim_costos c ON f.id_costo = c.id_costo
+    WHERE f.vigente = 1
+    GROUP BY p.continente
+    ORDER BY avg_hospedaje DESC
+    ''',
+    'paises_economicos': '''
+    SELECT 
+        p.pais,
+        p.continente,
+        SUM(f.valor) as costo_total
+    FROM fact_economicos f
+    JOIN dim_pais p ON f.id_pais = p.id_pais
+    JOIN dim_costos c ON f.id_costo = c.id_costo
+    WHERE f.vigente = 1 AND c.tipo_costo IN ('hospedaje', 'comida', 'transporte', 'entretenimiento')
+    GROUP BY p.pais, p.continente
+    ORDER BY costo_total ASC
+    LIMIT 10
+    ''',
+    'poblacion_big_mac': '''
+    SELECT 
+        p.pais,
+        p.poblacion,
+        f.valor as precio_big_mac
+    FROM fact_economicos f
+    JOIN dim_pais p ON f.id_pais = p.id_pais
+    JOIN dim_costos c ON f.id_costo = c.id_costo
+    WHERE f.vigente = 1 AND c.tipo_costo = 'big_mac'
+    AND p.poblacion > 0
+    ORDER BY p.poblacion DESC
+    LIMIT 10
+    '''
+}
+
+CONSULTAS_AGREGADAS = {
+    'big_mac_envejecimiento': '''
+    SELECT pais, continente, precio_big_mac, tasa_de_envejecimiento
+    FROM agg_pais
+    WHERE precio_big_mac IS NOT NULL
+    ORDER BY precio_big_mac DESC
+    LIMIT 10
+    ''',
+    'costos_continente': '''
+    SELECT continente, avg_hospedaje, avg_comida, avg_transporte, avg_entretenimiento
+    FROM agg_costos_continente
+    ORDER BY avg_hospedaje DESC
+    ''',
+    'paises_economicos': '''
+    SELECT pais, continente, costo_total
+    FROM agg_pais
+    WHERE costo_total IS NOT NULL
+    ORDER BY costo_total ASC
+    LIMIT 10
+    ''',
+    'poblacion_big_mac': '''
+    SELECT pais, poblacion, precio_big_mac
+    FROM agg_pais
+    WHERE precio_big_mac IS NOT NULL
+    AND poblacion > 0
+    ORDER BY poblacion DESC
+    LIMIT 10
+    '''
+}
+
+COLUMNAS_LECTURA = [
+    'id_pais', 'pais', 'capital', 'continente', 'region_costos', 'poblacion', 'tasa_de_envejecimiento'
+] + list(COLUMNAS_COSTOS)
+
+ARCHIVOS_INTEGRADOS = ['datos_integrados.arrow', 'datos_integrados.parquet', 'datos_integrados.csv']
+
+def crear_datawarehouse(incremental=False, db_path='data_warehouse.db', hechos_agrupados=False):
+    if os.path.exists(db_path) and not incremental:
         os.remove(db_path)
         print(f"Base de datos anterior eliminada: {db_path}")
     
@@ -14,19 +140,24 @@ def crear_datawarehouse():
     cursor = conn.cursor()
     
     cursor.execute('''
-    CREATE TABLE dim_pais (
+    CREATE TABLE IF NOT EXISTS dim_pais (
         id_pais INTEGER PRIMARY KEY,
+        id_pais_origen INTEGER NOT NULL,
         pais TEXT NOT NULL,
         capital TEXT,
         continente TEXT,
         region TEXT,
         poblacion REAL,
-        tasa_de_envejecimiento REAL
+        tasa_de_envejecimiento REAL,
+        hash_fila INTEGER,
+        id_tiempo_desde INTEGER,
+        id_tiempo_hasta INTEGER,
+        vigente INTEGER NOT NULL DEFAULT 1
     )
     ''')
     
     cursor.execute('''
-    CREATE TABLE dim_costos (
+    CREATE TABLE IF NOT EXISTS dim_costos (
         id_costo INTEGER PRIMARY KEY,
         tipo_costo TEXT NOT NULL,
         descripcion TEXT
@@ -34,7 +165,7 @@ def crear_datawarehouse():
     ''')
     
     cursor.execute('''
-    CREATE TABLE dim_tiempo (
+    CREATE TABLE IF NOT EXISTS dim_tiempo (
         id_tiempo INTEGER PRIMARY KEY,
         fecha_carga TEXT NOT NULL,
         anio INTEGER,
@@ -43,23 +174,102 @@ def crear_datawarehouse():
     )
     ''')
     
+    if hechos_agrupados:
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fact_economicos (
+            id_hecho INTEGER NOT NULL,
+            id_pais INTEGER NOT NULL,
+            id_costo INTEGER NOT NULL,
+            id_tiempo INTEGER,
+            valor REAL,
+            clave_hecho TEXT,
+            hash_hecho INTEGER,
+            vigente INTEGER NOT NULL DEFAULT 1,
+            PRIMARY KEY (id_costo, id_pais, id_hecho),
+            FOREIGN KEY (id_pais) REFERENCES dim_pais (id_pais),
+            FOREIGN KEY (id_costo) REFERENCES dim_costos (id_costo),
+            FOREIGN KEY (id_tiempo) REFERENCES dim_tiempo (id_tiempo)
+        ) WITHOUT ROWID
+        ''')
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_fact_id_hecho ON fact_economicos (id_hecho)")
+    else:
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fact_economicos (
+            id_hecho INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_pais INTEGER,
+            id_costo INTEGER,
+            id_tiempo INTEGER,
+            valor REAL,
+            clave_hecho TEXT,
+            hash_hecho INTEGER,
+            vigente INTEGER NOT NULL DEFAULT 1,
+            FOREIGN KEY (id_pais) REFERENCES dim_pais (id_pais),
+            FOREIGN KEY (id_costo) REFERENCES dim_costos (id_costo),
+            FOREIGN KEY (id_tiempo) REFERENCES dim_tiempo (id_tiempo)
+        )
+        ''')
+    
     cursor.execute('''
-    CREATE TABLE fact_economicos (
-        id_hecho INTEGER PRIMARY KEY AUTOINCREMENT,
-        id_pais INTEGER,
-        id_costo INTEGER,
-        id_tiempo INTEGER,
-        valor REAL,
-        FOREIGN KEY (id_pais) REFERENCES dim_pais (id_pais),
-        FOREIGN KEY (id_costo) REFERENCES dim_costos (id_costo),
-        FOREIGN KEY (id_tiempo) REFERENCES dim_tiempo (id_tiempo)
+    CREATE TABLE IF NOT EXISTS agg_pais (
+        id_pais_origen INTEGER PRIMARY KEY,
+        pais TEXT,
+        continente TEXT,
+        poblacion REAL,
+        tasa_de_envejecimiento REAL,
+        precio_big_mac REAL,
+        costo_hospedaje REAL,
+        costo_comida REAL,
+        costo_transporte REAL,
+        costo_entretenimiento REAL,
+        costo_total REAL
     )
     ''')
     
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS agg_costos_continente (
+        continente TEXT PRIMARY KEY,
+        avg_hospedaje REAL,
+        avg_comida REAL,
+        avg_transporte REAL,
+        avg_entretenimiento REAL
+    )
+    ''')
+    
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_agg_pais_big_mac ON agg_pais (precio_big_mac) WHERE precio_big_mac IS NOT NULL")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_agg_pais_costo_total ON agg_pais (costo_total) WHERE costo_total IS NOT NULL")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_agg_pais_poblacion ON agg_pais (poblacion) WHERE precio_big_mac IS NOT NULL")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_dim_pais_origen ON dim_pais (id_pais_origen) WHERE vigente = 1")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_fact_clave ON fact_economicos (clave_hecho) WHERE vigente = 1")
+    
     conn.commit()
-    print(f"Base de datos data warehouse creada: {db_path}")
+    print(f"Base de datos data warehouse {'abierta' if incremental else 'creada'}: {db_path}")
     return conn, cursor
 
+def tabla_hechos_agrupada(cursor):
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'fact_economicos'")
+    return 'WITHOUT ROWID' in cursor.fetchone()[0].upper()
+
+def crear_indices(conn, cursor, incremental=False):
+    """Crea los índices de las consultas de análisis y actualiza las estadísticas del planificador"""
+    indices = [
+        "CREATE INDEX IF NOT EXISTS idx_fact_pais_costo ON fact_economicos (id_pais, id_costo, valor) WHERE vigente = 1",
+        "CREATE INDEX IF NOT EXISTS idx_dim_costos_tipo ON dim_costos (tipo_costo, id_costo)"
+    ]
+    if not tabla_hechos_agrupada(cursor):
+        indices.append(
+            "CREATE INDEX IF NOT EXISTS idx_fact_costo_pais ON fact_economicos (id_costo, id_pais, valor) WHERE vigente = 1"
+        )
+    
+    for indice in indices:
+        cursor.execute(indice)
+    
+    if incremental:
+        cursor.execute("PRAGMA optimize")
+    else:
+        cursor.execute("ANALYZE")
+    conn.commit()
+    print(f"Índices creados y estadísticas actualizadas ({len(indices)} índices)")
+
 def cargar_dimension_costos(cursor):
     tipos_costos = [
         (1, 'big_mac', 'Precio del Big Mac en USD'),
@@ -70,7 +280,7 @@ def cargar_dimension_costos(cursor):
     ]
     
     cursor.executemany('''
-    INSERT INTO dim_costos (id_costo, tipo_costo, descripcion)
+    INSERT OR IGNORE INTO dim_costos (id_costo, tipo_costo, descripcion)
     VALUES (?, ?, ?)
     ''', tipos_costos)
     
@@ -78,87 +288,213 @@ def cargar_dimension_costos(cursor):
 
 def cargar_dimension_tiempo(cursor):
     ahora = datetime.now()
-    tiempo = (1, ahora.strftime('%Y-%m-%d'), ahora.year, ahora.month, ahora.day)
+    tiempo = (ahora.strftime('%Y-%m-%d'), ahora.year, ahora.month, ahora.day)
     
     cursor.execute('''
-    INSERT INTO dim_tiempo (id_tiempo, fecha_carga, anio, mes, dia)
-    VALUES (?, ?, ?, ?, ?)
+    INSERT INTO dim_tiempo (fecha_carga, anio, mes, dia)
+    VALUES (?, ?, ?, ?)
     ''', tiempo)
     
-    print(f"Dimensión tiempo cargada con fecha: {tiempo[1]}")
-    return tiempo[0] 
+    print(f"Dimensión tiempo cargada con fecha: {tiempo[0]} (id_tiempo {cursor.lastrowid})")
+    return cursor.lastrowid
+
+def calcular_hash(df):
+    return pd.util.hash_pandas_object(df, index=False).astype('int64')
+
+def filas_existentes(df, df_existentes, columnas):
+    """Máscara de las filas de df cuya combinación (clave, hash) ya está en df_existentes"""
+    if df_existentes.empty:
+        return np.zeros(len(df), dtype=bool)
+    claves = pd.MultiIndex.from_frame(df[columnas])
+    return claves.isin(pd.MultiIndex.from_frame(df_existentes[columnas]))
+
+def cargar_dimension_pais(cursor, df, id_tiempo, tipo_scd=TIPO_SCD):
+    """Inserta países nuevos y aplica SCD tipo 1 o 2 a los que cambiaron.
+
+    Devuelve el mapa id_pais_origen -> id_pais vigente y los id_pais_origen nuevos o modificados.
+    """
+    df_dim = pd.DataFrame({
+        'id_pais_origen': df['id_pais'].astype('int64'),
+        'pais': df['pais'],
+        'capital': df['capital'],
+        'continente': df['continente'],
+        'region': df['region_costos'] if 'region_costos' in df.columns else 'Desconocido',
+        'poblacion': df['poblacion'],
+        'tasa_de_envejecimiento': df['tasa_de_envejecimiento']
+    })
+    atributos = COLUMNAS_DIM_PAIS[1:]
+    df_dim['hash_fila'] = calcular_hash(df_dim[atributos])
+    
+    cursor.execute("SELECT id_pais_origen, id_pais, hash_fila FROM dim_pais WHERE vigente = 1")
+    df_vigentes = pd.DataFrame(cursor.fetchall(), columns=['id_pais_origen', 'id_pais', 'hash_fila'])
+    dimension_vacia = len(df_vigentes) == 0 and cursor.execute("SELECT COUNT(*) FROM dim_pais").fetchone()[0] == 0
+    
+    sin_cambios = filas_existentes(df_dim, df_vigentes, ['id_pais_origen', 'hash_fila'])
+    df_dim = df_dim.merge(df_vigentes[['id_pais_origen', 'id_pais']].astype('Int64'), on='id_pais_origen', how='left')
+    es_nuevo = df_dim['id_pais'].isna()
+    es_cambiado = ~es_nuevo & ~sin_cambios
+    
+    df_cambiados = df_dim[es_cambiado]
+    if tipo_scd == 1:
+        cursor.executemany(f'''
+        UPDATE dim_pais
+        SET {', '.join(f"{col} = ?" for col in atributos)}, hash_fila = ?
+        WHERE id_pais = ?
+        ''', df_cambiados[atributos + ['hash_fila', 'id_pais']].astype(object).itertuples(index=False, name=None))
+        df_insertar = df_dim[es_nuevo]
+    else:
+        cursor.executemany('''
+        UPDATE dim_pais SET vigente = 0, id_tiempo_hasta = ? WHERE id_pais = ?
+        ''', ((id_tiempo, int(id_pais)) for id_pais in df_cambiados['id_pais']))
+        df_insertar = df_dim[es_nuevo | es_cambiado]
+    
+    df_insertar = df_insertar[COLUMNAS_DIM_PAIS + ['hash_fila']].copy()
+    df_insertar.insert(0, 'id_pais', df_insertar['id_pais_origen'] if dimension_vacia else None)
+    df_insertar['id_tiempo_desde'] = id_tiempo
+    cursor.executemany(f'''
+    INSERT INTO dim_pais ({', '.join(df_insertar.columns)}, vigente)
+    VALUES ({', '.join('?' for _ in df_insertar.columns)}, 1)
+    ''', df_insertar.astype(object).itertuples(index=False, name=None))
+    
+    print(f"Dimensión país: {int(es_nuevo.sum())} países nuevos, {int(es_cambiado.sum())} actualizados (SCD tipo {tipo_scd})")
+    
+    cursor.execute("SELECT id_pais_origen, id_pais FROM dim_pais WHERE vigente = 1")
+    return dict(cursor.fetchall()), set(df_dim.loc[es_nuevo | es_cambiado, 'id_pais_origen'].tolist())
+
+def cargar_hechos(cursor, df, mapa_pais, id_tiempo):
+    """Agrega solo los hechos cuyo contenido cambió y marca como no vigentes los que reemplazan.
+
+    Devuelve los id_pais_origen que recibieron hechos nuevos.
+    """
+    cursor.execute("SELECT tipo_costo, id_costo FROM dim_costos")
+    ids_costo = dict(cursor.fetchall())
+    columnas = {col: ids_costo[tipo] for col, tipo in COLUMNAS_COSTOS.items() if col in df.columns}
+    
+    df_hechos = (df[['id_pais'] + list(columnas)]
+                 .melt(id_vars='id_pais', var_name='columna', value_name='valor', ignore_index=False)
+                 .sort_index(kind='stable')
+                 .dropna(subset=['valor'])
+                 .reset_index(drop=True))
+    
+    df_hechos['id_costo'] = df_hechos['columna'].map(columnas)
+    df_hechos['id_pais_origen'] = df_hechos['id_pais'].astype('int64')
+    df_hechos['clave_hecho'] = df_hechos['id_pais_origen'].astype(str) + ':' + df_hechos['id_costo'].astype(str)
+    df_hechos['id_pais'] = df_hechos['id_pais_origen'].map(mapa_pais)
+    df_hechos['id_tiempo'] = id_tiempo
+    df_hechos['hash_hecho'] = calcular_hash(df_hechos[['id_pais', 'id_costo', 'valor']])
+    
+    cursor.execute("SELECT clave_hecho, hash_hecho FROM fact_economicos WHERE vigente = 1")
+    df_vigentes = pd.DataFrame(cursor.fetchall(), columns=['clave_hecho', 'hash_hecho'])
+    
+    df_hechos = df_hechos[~filas_existentes(df_hechos, df_vigentes, ['clave_hecho', 'hash_hecho'])]
+    reemplazados = df_hechos.loc[df_hechos['clave_hecho'].isin(df_vigentes['clave_hecho']), 'clave_hecho']
+    
+    cursor.executemany('''
+    UPDATE fact_economicos SET vigente = 0 WHERE clave_hecho = ? AND vigente = 1
+    ''', ((clave,) for clave in reemplazados))
+    
+    cursor.execute("SELECT COALESCE(MAX(id_hecho), 0) FROM fact_economicos")
+    df_hechos = df_hechos.assign(id_hecho=np.arange(1, len(df_hechos) + 1) + cursor.fetchone()[0])
+    
+    cursor.executemany('''
+    INSERT INTO fact_economicos (id_hecho, id_pais, id_costo, id_tiempo, valor, clave_hecho, hash_hecho)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', df_hechos[['id_hecho', 'id_pais', 'id_costo', 'id_tiempo', 'valor', 'clave_hecho', 'hash_hecho']]
+        .astype(object).itertuples(index=False, name=None))
+    
+    print(f"Tabla de hechos: {len(df_hechos)} registros nuevos, {len(reemplazados)} reemplazados")
+    return set(df_hechos['id_pais_origen'].tolist())
 
-def cargar_datos_integrados(conn, cursor, id_tiempo):
+def actualizar_agregados(cursor, afectados):
+    """Recalcula agg_pais solo para los países afectados y agg_costos_continente a partir de agg_pais"""
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS tmp_afectados (id_pais_origen INTEGER PRIMARY KEY)")
+    cursor.execute("DELETE FROM tmp_afectados")
+    cursor.executemany("INSERT INTO tmp_afectados VALUES (?)", ((int(origen),) for origen in afectados))
+    
+    cursor.execute("DELETE FROM agg_pais WHERE id_pais_origen IN (SELECT id_pais_origen FROM tmp_afectados)")
+    cursor.execute('''
+    INSERT INTO agg_pais
+    SELECT
+        p.id_pais_origen,
+        p.pais,
+        p.continente,
+        p.poblacion,
+        p.tasa_de_envejecimiento,
+        MAX(CASE WHEN c.tipo_costo = 'big_mac' THEN f.valor END),
+        MAX(CASE WHEN c.tipo_costo = 'hospedaje' THEN f.valor END),
+        MAX(CASE WHEN c.tipo_costo = 'comida' THEN f.valor END),
+        MAX(CASE WHEN c.tipo_costo = 'transporte' THEN f.valor END),
+        MAX(CASE WHEN c.tipo_costo = 'entretenimiento' THEN f.valor END),
+        SUM(CASE WHEN c.tipo_costo IN ('hospedaje', 'comida', 'transporte', 'entretenimiento') THEN f.valor END)
+    FROM dim_pais p
+    LEFT JOIN fact_economicos f ON f.id_pais = p.id_pais AND f.vigente = 1
+    LEFT JOIN dim_costos c ON f.id_costo = c.id_costo
+    WHERE p.vigente = 1 AND p.id_pais_origen IN (SELECT id_pais_origen FROM tmp_afectados)
+    GROUP BY p.id_pais_origen
+    ''')
+    
+    cursor.execute("DELETE FROM agg_costos_continente")
+    cursor.execute('''
+    INSERT INTO agg_costos_continente
+    SELECT continente, AVG(costo_hospedaje), AVG(costo_comida), AVG(costo_transporte), AVG(costo_entretenimiento)
+    FROM agg_pais
+    WHERE precio_big_mac IS NOT NULL OR costo_total IS NOT NULL
+    GROUP BY continente
+    ''')
+    
+    print(f"Agregados actualizados para {len(afectados)} países")
+
+def hay_agregados(cursor):
+    cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ('agg_pais', 'agg_costos_continente')")
+    return cursor.fetchone()[0] == 2
+
+def cargar_dataframe_integrado(conn, cursor, df, id_tiempo, tipo_scd=TIPO_SCD):
+    """Carga dim_pais, fact_economicos y los agregados en una sola transacción"""
+    df = df.drop_duplicates(subset='id_pais')
     try:
-        df = pd.read_csv('datos_integrados.csv')
-        print(f"Datos cargados desde CSV: {len(df)} registros")
-        
-        for _, row in df.iterrows():
-            cursor.execute('''
-            INSERT OR IGNORE INTO dim_pais (id_pais, pais, capital, continente, region, poblacion, tasa_de_envejecimiento)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                int(row['id_pais']),
-                row['pais'],
-                row['capital'],
-                row['continente'],
-                row.get('region_costos', 'Desconocido'),
-                row['poblacion'],
-                row['tasa_de_envejecimiento']
-            ))
-        
+        mapa_pais, paises_modificados = cargar_dimension_pais(cursor, df, id_tiempo, tipo_scd)
+        paises_con_hechos = cargar_hechos(cursor, df, mapa_pais, id_tiempo)
+        actualizar_agregados(cursor, paises_modificados | paises_con_hechos)
         conn.commit()
-        print(f"Dimensión país cargada con {len(df)} registros")
-        
-        hechos = []
-        for _, row in df.iterrows():
-            if pd.notna(row['precio_big_mac_usd']):
-                hechos.append((
-                    int(row['id_pais']),
-                    1,  
-                    id_tiempo,
-                    row['precio_big_mac_usd']
-                ))
-            
-            if 'costo_bajo_hospedaje' in row and pd.notna(row['costo_bajo_hospedaje']):
-                hechos.append((
-                    int(row['id_pais']),
-                    2,  
-                    id_tiempo,
-                    row['costo_bajo_hospedaje']
-                ))
-            
-            if 'costo_promedio_comida' in row and pd.notna(row['costo_promedio_comida']):
-                hechos.append((
-                    int(row['id_pais']),
-                    3,  
-                    id_tiempo,
-                    row['costo_promedio_comida']
-                ))
-            
-            if 'costo_bajo_transporte' in row and pd.notna(row['costo_bajo_transporte']):
-                hechos.append((
-                    int(row['id_pais']),
-                    4,  
-                    id_tiempo,
-                    row['costo_bajo_transporte']
-                ))
-            
-            if 'costo_promedio_entretenimiento' in row and pd.notna(row['costo_promedio_entretenimiento']):
-                hechos.append((
-                    int(row['id_pais']),
-                    5,  
-                    id_tiempo,
-                    row['costo_promedio_entretenimiento']
-                ))
-        
-        cursor.executemany('''
-        INSERT INTO fact_economicos (id_pais, id_costo, id_tiempo, valor)
-        VALUES (?, ?, ?, ?)
-        ''', hechos)
+    except Exception:
+        conn.rollback()
+        raise
+
+def elegir_archivo_integrado():
+    """El archivo de datos integrados más reciente; ante empate se prefiere el formato columnar"""
+    candidatos = [ruta for ruta in ARCHIVOS_INTEGRADOS
+                  if os.path.exists(ruta) and (feather is not None or ruta.endswith('.csv'))]
+    if not candidatos:
+        return ARCHIVOS_INTEGRADOS[-1]
+    return max(candidatos, key=lambda ruta: (os.path.getmtime(ruta), -ARCHIVOS_INTEGRADOS.index(ruta)))
+
+def leer_datos_integrados(ruta=None, columnas=None):
+    """Lee los datos integrados desde Arrow (memory map), Parquet o CSV cargando solo las columnas pedidas"""
+    ruta = ruta or elegir_archivo_integrado()
+    
+    if ruta.endswith('.arrow'):
+        tabla = feather.read_table(ruta, memory_map=True)
+        if columnas is not None:
+            tabla = tabla.select([col for col in columnas if col in tabla.column_names])
+        df = tabla.to_pandas()
+    elif ruta.endswith('.parquet'):
+        nombres = pq.read_schema(ruta).names
+        df = pd.read_parquet(ruta, columns=None if columnas is None else [col for col in columnas if col in nombres])
+    else:
+        df = pd.read_csv(ruta, usecols=None if columnas is None else lambda col: col in columnas)
+    
+    # float32 del perfil compacto: pasar por texto evita arrastrar el error de redondeo a float64
+    for col in df.select_dtypes(include=['float32']).columns:
+        df[col] = pd.to_numeric(df[col].astype(str))
+    
+    print(f"Datos cargados desde {ruta}: {len(df)} registros")
+    return df
+
+def cargar_datos_integrados(conn, cursor, id_tiempo, tipo_scd=TIPO_SCD, ruta=None):
+    try:
+        df = leer_datos_integrados(ruta, COLUMNAS_LECTURA)
         
-        conn.commit()
-        print(f"Tabla de hechos cargada con {len(hechos)} registros")
+        cargar_dataframe_integrado(conn, cursor, df, id_tiempo, tipo_scd)
         
         return True
     except Exception as e:
@@ -180,34 +516,18 @@ def verificar_carga(cursor):
     count = cursor.fetchone()[0]
     print(f"- dim_tiempo: {count} registros")
     
-    cursor.execute("SELECT COUNT(*) FROM fact_economicos")
-    count = cursor.fetchone()[0]
-    print(f"- fact_economicos: {count} registros")
+    cursor.execute("SELECT COUNT(*), SUM(vigente) FROM fact_economicos")
+    count, vigentes = cursor.fetchone()
+    print(f"- fact_economicos: {count} registros ({vigentes or 0} vigentes)")
     
     print("\nTop 5 países con precio de Big Mac más alto:")
-    cursor.execute('''
-    SELECT p.pais, p.continente, f.valor
-    FROM fact_economicos f
-    JOIN dim_pais p ON f.id_pais = p.id_pais
-    JOIN dim_costos c ON f.id_costo = c.id_costo
-    WHERE c.tipo_costo = 'big_mac'
-    ORDER BY f.valor DESC
-    LIMIT 5
-    ''')
+    cursor.execute(CONSULTAS['top_big_mac'], (5,))
     
     for row in cursor.fetchall():
         print(f"- {row[0]} ({row[1]}): ${row[2]:.2f}")
     
     print("\nPromedio de costos de hospedaje por continente:")
-    cursor.execute('''
-    SELECT p.continente, AVG(f.valor) as promedio
-    FROM fact_economicos f
-    JOIN dim_pais p ON f.id_pais = p.id_pais
-    JOIN dim_costos c ON f.id_costo = c.id_costo
-    WHERE c.tipo_costo = 'hospedaje'
-    GROUP BY p.continente
-    ORDER BY promedio DESC
-    ''')
+    cursor.execute(CONSULTAS['hospedaje_continente'])
     
     for row in cursor.fetchall():
         print(f"- {row[0]}: ${row[1]:.2f}")
@@ -215,34 +535,16 @@ def verificar_carga(cursor):
 def realizar_analisis(cursor):
     print("\n--- ANÁLISIS DE DATOS DEL DATA WAREHOUSE ---")
     
+    consultas = {**CONSULTAS, **CONSULTAS_AGREGADAS} if hay_agregados(cursor) else CONSULTAS
+    
     print("\n1. Países con alto precio de Big Mac y su tasa de envejecimiento:")
-    cursor.execute('''
-    SELECT p.pais, p.continente, f.valor as precio_big_mac, p.tasa_de_envejecimiento
-    FROM fact_economicos f
-    JOIN dim_pais p ON f.id_pais = p.id_pais
-    JOIN dim_costos c ON f.id_costo = c.id_costo
-    WHERE c.tipo_costo = 'big_mac'
-    ORDER BY f.valor DESC
-    LIMIT 10
-    ''')
+    cursor.execute(consultas['big_mac_envejecimiento'])
     
     for row in cursor.fetchall():
         print(f"- {row[0]} ({row[1]}): Big Mac ${row[2]:.2f}, Envejecimiento {row[3]:.2f}%")
     
     print("\n2. Comparativa de costos turísticos por continente:")
-    cursor.execute('''
-    SELECT 
-        p.continente,
-        avg(CASE WHEN c.tipo_costo = 'hospedaje' THEN f.valor ELSE NULL END) as avg_hospedaje,
-        avg(CASE WHEN c.tipo_costo = 'comida' THEN f.valor ELSE NULL END) as avg_comida,
-        avg(CASE WHEN c.tipo_costo = 'transporte' THEN f.valor ELSE NULL END) as avg_transporte,
-        avg(CASE WHEN c.tipo_costo = 'entretenimiento' THEN f.valor ELSE NULL END) as avg_entretenimiento
-    FROM fact_economicos f
-    JOIN dim_pais p ON f.id_pais = p.id_pais
-    JOIN dim_costos c ON f.id_costo = c.id_costo
-    GROUP BY p.continente
-    ORDER BY avg_hospedaje DESC
-    ''')
+    cursor.execute(consultas['costos_continente'])
     
     for row in cursor.fetchall():
         print(f"- {row[0]}:")
@@ -252,58 +554,66 @@ def realizar_analisis(cursor):
         print(f"  * Entretenimiento: ${row[4]:.2f}")
     
     print("\n3. Países más económicos para turistas:")
-    cursor.execute('''
-    SELECT 
-        p.pais,
-        p.continente,
-        SUM(f.valor) as costo_total
-    FROM fact_economicos f
-    JOIN dim_pais p ON f.id_pais = p.id_pais
-    JOIN dim_costos c ON f.id_costo = c.id_costo
-    WHERE c.tipo_costo IN ('hospedaje', 'comida', 'transporte', 'entretenimiento')
-    GROUP BY p.pais, p.continente
-    ORDER BY costo_total ASC
-    LIMIT 10
-    ''')
+    cursor.execute(consultas['paises_economicos'])
     
     for row in cursor.fetchall():
         print(f"- {row[0]} ({row[1]}): ${row[2]:.2f}")
     
     print("\n4. Relación entre población y precio de Big Mac:")
-    cursor.execute('''
-    SELECT 
-        p.pais,
-        p.poblacion,
-        f.valor as precio_big_mac
-    FROM fact_economicos f
-    JOIN dim_pais p ON f.id_pais = p.id_pais
-    JOIN dim_costos c ON f.id_costo = c.id_costo
-    WHERE c.tipo_costo = 'big_mac'
-    AND p.poblacion > 0
-    ORDER BY p.poblacion DESC
-    LIMIT 10
-    ''')
+    cursor.execute(consultas['poblacion_big_mac'])
     
     for row in cursor.fetchall():
         print(f"- {row[0]}: Población {row[1]:,.0f}, Big Mac ${row[2]:.2f}")
 
-def main():
+def reporte_plan_consultas(cursor):
+    """Muestra el EXPLAIN QUERY PLAN de cada consulta de análisis y los índices que usa"""
+    print("\n--- PLAN DE EJECUCIÓN DE LAS CONSULTAS ---")
+    
+    consultas = dict(CONSULTAS)
+    if hay_agregados(cursor):
+        consultas.update({f"{nombre} (agregado)": consulta for nombre, consulta in CONSULTAS_AGREGADAS.items()})
+    
+    for nombre, consulta in consultas.items():
+        parametros = (5,) if consulta.count('?') else ()
+        cursor.execute(f"EXPLAIN QUERY PLAN {consulta}", parametros)
+        pasos = [row[3] for row in cursor.fetchall()]
+        
+        indices = sorted({paso.split(' INDEX ')[1].split(' ')[0] for paso in pasos if ' INDEX ' in paso} |
+                         {'PRIMARY KEY' for paso in pasos if paso.startswith('SEARCH f USING PRIMARY KEY')})
+        print(f"\n{nombre}: {', '.join(indices) if indices else 'sin índices'}")
+        for paso in pasos:
+            print(f"  {paso}")
+
+def main(incremental=False, tipo_scd=TIPO_SCD, hechos_agrupados=False, explicar=False):
     print("Ejercicio 2.4\n")
     
-    conn, cursor = crear_datawarehouse()
+    conn, cursor = crear_datawarehouse(incremental, hechos_agrupados=hechos_agrupados)
     
     cargar_dimension_costos(cursor)
     id_tiempo = cargar_dimension_tiempo(cursor)
     
-    exito = cargar_datos_integrados(conn, cursor, id_tiempo)
+    exito = cargar_datos_integrados(conn, cursor, id_tiempo, tipo_scd)
     
     if exito:
+        crear_indices(conn, cursor, incremental)
         verificar_carga(cursor)
         realizar_analisis(cursor)
+        if explicar:
+            reporte_plan_consultas(cursor)
     
     conn.close()
     
     print("\nProceso de carga en el Data Warehouse completado.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Carga del data warehouse")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Conserva el historial y solo agrega los cambios en lugar de reconstruir")
+    parser.add_argument('--scd', type=int, choices=[1, 2], default=TIPO_SCD,
+                        help="Tipo de dimensión lentamente cambiante para dim_pais")
+    parser.add_argument('--hechos-agrupados', action='store_true',
+                        help="Crea fact_economicos WITHOUT ROWID agrupada por (id_costo, id_pais)")
+    parser.add_argument('--explicar', action='store_true',
+                        help="Muestra el EXPLAIN QUERY PLAN de las consultas de análisis")
+    args = parser.parse_args()
+    main(args.incremental, args.scd, args.hechos_agrupados, args.explicar)
@@ -0,0 +1,88 @@
+import os
+import re
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class CursorMySQL:
+    """Cursor DB-API que traduce a sqlite3 el SQL de MySQL que usa importador_mysql"""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._cursor = conn.cursor()
+        self.sentencias = []
+
+    def execute(self, query, params=()):
+        self.sentencias.append(query)
+        if 'information_schema.KEY_COLUMN_USAGE' in query:
+            return self._columnas_clave_primaria(params[0])
+        alter = re.match(r"ALTER TABLE `(\w+)` ADD PRIMARY KEY \((.*)\)$", query)
+        if alter:
+            # sqlite no agrega claves primarias a tablas existentes; un índice único cumple el mismo papel
+            tabla, columnas = alter.groups()
+            return self._cursor.execute(f"CREATE UNIQUE INDEX `pk_{tabla}` ON `{tabla}` ({columnas})")
+        return self._cursor.execute(self._traducir(query), params)
+
+    def executemany(self, query, filas):
+        self.sentencias.append(query)
+        return self._cursor.executemany(self._traducir(query), filas)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+    @staticmethod
+    def _traducir(query):
+        query = query.replace('%s', '?')
+        if 'ON DUPLICATE KEY UPDATE' in query:
+            query, actualizaciones = query.split(' ON DUPLICATE KEY UPDATE ')
+            actualizaciones = re.sub(r"VALUES\((`\w+`)\)", r"excluded.\1", actualizaciones)
+            query += f" ON CONFLICT DO UPDATE SET {actualizaciones}"
+        return query
+
+    def _columnas_clave_primaria(self, tabla):
+        """Responde la consulta a information_schema con la clave primaria o el índice pk_<tabla>"""
+        indices = [fila[1] for fila in self._conn.execute(f"PRAGMA index_list(`{tabla}`)")]
+        if f"pk_{tabla}" in indices:
+            return self._cursor.execute(f"SELECT name FROM pragma_index_info('pk_{tabla}') ORDER BY seqno")
+        return self._cursor.execute(f"SELECT name FROM pragma_table_info('{tabla}') WHERE pk > 0 ORDER BY pk")
+
+
+class ConexionMySQL:
+    def __init__(self, ruta):
+        self._conn = sqlite3.connect(ruta)
+        self.cursores = []
+
+    def cursor(self):
+        cursor = CursorMySQL(self._conn)
+        self.cursores.append(cursor)
+        return cursor
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+    def consultar(self, query):
+        return self._conn.execute(query).fetchall()
+
+
+@pytest.fixture
+def conexion_mysql(tmp_path):
+    """Conexión sobre sqlite3 que acepta el SQL de MySQL de importador_mysql, para probar sin servidor"""
+    conn = ConexionMySQL(str(tmp_path / 'mysql.db'))
+    yield conn
+    conn.close()
@@ -0,0 +1,167 @@
+import io
+import os
+
+import pandas as pd
+import pytest
+
+import importador_mysql
+
+
+def escribir_csv(ruta, valores, mtime_ns=None):
+    pd.DataFrame({
+        'id_pais': range(1, len(valores) + 1),
+        'nombre_pais': [f"Pais {i}" for i in range(1, len(valores) + 1)],
+        'tasa': valores
+    }).to_csv(ruta, index=False)
+    if mtime_ns is not None:
+        os.utime(ruta, ns=(mtime_ns, mtime_ns))
+
+
+def importar(conn, ruta, **kwargs):
+    kwargs.setdefault('tamano_chunk', 4)
+    kwargs.setdefault('claves', ['id_pais'])
+    return importador_mysql.importar_csv(conn, str(ruta), 't', **kwargs)
+
+
+def test_reanuda_tras_una_interrupcion(conexion_mysql, tmp_path, monkeypatch):
+    ruta = tmp_path / 'datos.csv'
+    escribir_csv(ruta, [float(i) for i in range(10)])
+
+    insertar = importador_mysql.insertar_chunk_multi
+    llamadas = []
+
+    def falla_en_el_tercer_chunk(cursor, table_name, chunk, claves=()):
+        llamadas.append(len(chunk))
+        if len(llamadas) == 3:
+            raise RuntimeError("conexión perdida")
+        insertar(cursor, table_name, chunk, claves)
+
+    monkeypatch.setattr(importador_mysql, 'insertar_chunk_multi', falla_en_el_tercer_chunk)
+    with pytest.raises(RuntimeError):
+        importar(conexion_mysql, ruta)
+    conexion_mysql.rollback()
+    assert conexion_mysql.consultar("SELECT COUNT(*) FROM t") == [(8,)]
+
+    monkeypatch.setattr(importador_mysql, 'insertar_chunk_multi', insertar)
+    assert importar(conexion_mysql, ruta) == 10
+    assert conexion_mysql.consultar("SELECT tasa FROM t ORDER BY id_pais") == [(float(i),) for i in range(10)]
+
+
+def test_archivo_sin_cambios_no_se_reimporta(conexion_mysql, tmp_path):
+    ruta = tmp_path / 'datos.csv'
+    escribir_csv(ruta, [1.0] * 10)
+    importar(conexion_mysql, ruta)
+
+    assert importar(conexion_mysql, ruta) == 10
+    assert conexion_mysql.consultar("SELECT COUNT(*) FROM t") == [(10,)]
+
+
+def test_archivo_modificado_se_reimporta_desde_cero(conexion_mysql, tmp_path):
+    ruta = tmp_path / 'datos.csv'
+    escribir_csv(ruta, [1.0] * 10, mtime_ns=1_000_000_000)
+    importar(conexion_mysql, ruta)
+
+    escribir_csv(ruta, [2.0] * 10, mtime_ns=2_000_000_000)
+    importar(conexion_mysql, ruta)
+
+    assert conexion_mysql.consultar("SELECT COUNT(*), MIN(tasa), MAX(tasa) FROM t") == [(10, 2.0, 2.0)]
+
+
+def test_celdas_vacias_se_cargan_como_null(conexion_mysql, tmp_path):
+    ruta = tmp_path / 'datos.csv'
+    pd.DataFrame({
+        'id_pais': [1, 2, 3],
+        'capital': ['Riga', None, 'Lima, Perú'],
+        'tasa': [12.5, None, 8.0]
+    }).to_csv(ruta, index=False)
+
+    importar(conexion_mysql, ruta)
+
+    assert conexion_mysql.consultar("SELECT capital, tasa FROM t ORDER BY id_pais") == [
+        ('Riga', 12.5), (None, None), ('Lima, Perú', 8.0)
+    ]
+
+
+class CursorQueGuarda:
+    def __init__(self):
+        self.sentencias = []
+
+    def execute(self, query, params=()):
+        self.sentencias.append(query)
+
+
+def test_load_data_marca_los_nulos_con_barra_n(monkeypatch):
+    contenidos = []
+    remove = os.remove
+
+    def leer_y_borrar(ruta):
+        with open(ruta, 'rb') as f:
+            contenidos.append(f.read())
+        remove(ruta)
+
+    monkeypatch.setattr(importador_mysql.os, 'remove', leer_y_borrar)
+    cursor = CursorQueGuarda()
+    chunk = pd.DataFrame({
+        'id_pais': [1, 2, 3, 4],
+        'capital': ['NULL', None, 'Lima, Perú', 'C:\\datos\\N'],
+        'tasa': [12.5, None, 8.0, 1.0]
+    })
+
+    importador_mysql.insertar_chunk_load_data(cursor, 't', chunk)
+
+    assert contenidos == [
+        b'1,NULL,12.5\n2,\\N,\\N\n3,"Lima, Per\xc3\xba",8.0\n4,C:\\\\datos\\\\N,1.0\n'
+    ]
+    assert "ESCAPED BY '\\\\'" in cursor.sentencias[0]
+    assert "LINES TERMINATED BY '\\n'" in cursor.sentencias[0]
+
+
+def test_load_data_no_deja_barras_invertidas_en_la_ruta(monkeypatch):
+    class TemporalWindows(io.StringIO):
+        name = 'C:\\Users\\o\'brien\\AppData\\Local\\Temp\\chunk.csv'
+
+        def __init__(self, *args, **kwargs):
+            super().__init__()
+
+    monkeypatch.setattr(importador_mysql.tempfile, 'NamedTemporaryFile', TemporalWindows)
+    monkeypatch.setattr(importador_mysql.os, 'remove', lambda ruta: None)
+    cursor = CursorQueGuarda()
+
+    importador_mysql.insertar_chunk_load_data(cursor, 't', pd.DataFrame({'id_pais': [1]}))
+
+    assert "INFILE 'C:/Users/o\\'brien/AppData/Local/Temp/chunk.csv'" in cursor.sentencias[0]
+
+
+def test_tabla_existente_sin_clave_recibe_primary_key(conexion_mysql, tmp_path):
+    conexion_mysql.consultar("CREATE TABLE t (id_pais INT, nombre_pais VARCHAR(255), tasa FLOAT)")
+    ruta = tmp_path / 'datos.csv'
+    escribir_csv(ruta, [1.0] * 10)
+
+    importar(conexion_mysql, ruta)
+    importar(conexion_mysql, ruta, reanudar=False)
+
+    assert conexion_mysql.consultar("SELECT COUNT(*) FROM t") == [(10,)]
+
+
+def test_tabla_existente_con_filas_repetidas_explica_el_error(conexion_mysql, tmp_path):
+    conexion_mysql.consultar("CREATE TABLE t (id_pais INT, nombre_pais VARCHAR(255), tasa FLOAT)")
+    conexion_mysql.consultar("INSERT INTO t VALUES (1, 'Pais 1', 1.0), (1, 'Pais 1', 1.0)")
+    ruta = tmp_path / 'datos.csv'
+    escribir_csv(ruta, [1.0] * 10)
+
+    with pytest.raises(ValueError, match="filas repetidas"):
+        importar(conexion_mysql, ruta)
+
+
+def test_cache_ddl_conserva_solo_las_versiones_actuales(tmp_path):
+    ruta = tmp_path / 'datos.csv'
+    cache_ruta = str(tmp_path / 'cache.json')
+    escribir_csv(ruta, [1.0] * 10, mtime_ns=1_000_000_000)
+    cache = {'retirado.csv:10:1': {'id_pais': 'INT'}}
+    importador_mysql.esquema_cacheado(str(ruta), cache)
+
+    escribir_csv(ruta, [2.0] * 10, mtime_ns=2_000_000_000)
+    importador_mysql.esquema_cacheado(str(ruta), cache)
+    importador_mysql.guardar_cache_ddl(cache, cache_ruta, archivos=[str(ruta)])
+
+    assert list(importador_mysql.cargar_cache_ddl(cache_ruta)) == [importador_mysql.huella_archivo(str(ruta))]
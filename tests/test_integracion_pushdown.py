@@ -0,0 +1,119 @@
+import os
+import uuid
+
+import pandas as pd
+import pytest
+from pymongo import MongoClient
+
+import script_integracion as si
+
+# mongomock no implementa $lookup con let/pipeline ni $unionWith: la agregación se prueba contra un servidor real
+MONGO_URI_PRUEBAS = os.getenv('MONGO_URI_PRUEBAS')
+
+
+def costos(pais, hospedaje, region='Europa del Sur'):
+    return {
+        'pais': pais, 'continente': 'Europa', 'poblacion': 1000, 'capital': 'Capital', 'region': region,
+        'costos': {'hospedaje_precio_bajo_usd': hospedaje, 'comida_precio_bajo_usd': hospedaje / 2},
+        'tipo_dato': 'costos_turisticos', 'fuente': 'costos_turisticos_europa.json'
+    }
+
+
+def big_mac(pais, precio):
+    return {'pais': pais, 'continente': 'Europa', 'precio_big_mac_usd': precio, 'tipo_dato': 'big_mac'}
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    if not MONGO_URI_PRUEBAS:
+        pytest.skip("MONGO_URI_PRUEBAS no está definida (MongoDB 4.4 o posterior)")
+    client = MongoClient(MONGO_URI_PRUEBAS)
+    # una base propia por prueba para no tocar paisesDB
+    monkeypatch.setattr(si, 'MONGO_DB', f"paisesDB_pruebas_{uuid.uuid4().hex}")
+    db = client[si.MONGO_DB]
+    db['costos_turisticos'].insert_many([
+        costos('Albania', 58.3),
+        costos('CHILE', 40.0),            # solo coincide en minúsculas con 'Chile'
+        costos('EEUU', 120.0),            # solo coincide con 'Estados Unidos' por la tabla de alias
+        costos('Noruega', 150.0),         # sin Big Mac
+        costos('Portugal', 70.0)
+    ])
+    db['big_mac_index'].insert_many([
+        big_mac('Albania', 5.79),
+        big_mac('Chile', 4.2),
+        big_mac('Estados Unidos', 5.69),
+        big_mac('Andorra', 2.08),         # sin costos
+        big_mac('Portugal', 4.1)
+    ])
+    yield client
+    client.drop_database(si.MONGO_DB)
+    client.close()
+
+
+@pytest.fixture
+def relacionales():
+    df_envejecimiento = pd.DataFrame({
+        'id_pais': [1, 2, 3],
+        'nombre_pais': ['Albania', 'Chile', 'Japón'],
+        'capital': ['Tirana', 'Santiago', None],
+        'continente': ['Europa', 'América', None],
+        'region': ['Europa del Sur', 'Sudamérica', None],
+        'poblacion': [2877797.0, 19116201.0, None],
+        'tasa_de_envejecimiento': [15.1, 15.5, 22.3]
+    })
+    df_poblacion = pd.DataFrame({
+        '_id': ['a', 'b'],
+        'continente': ['Europa', 'Asia'],
+        'pais': ['Albania', 'Japón'],
+        'poblacion': [2877797, 125800000],
+        'costo_bajo_hospedaje': [7, 30]
+    })
+    return df_envejecimiento, df_poblacion
+
+
+def integrar_sin_pushdown(cliente, df_envejecimiento, df_poblacion):
+    df_big_mac, df_costos = si.extraer_datos_mongodb(cliente)
+    return si.integrar_datos(*si.preparar_dataframes(df_envejecimiento.copy(), df_poblacion.copy(),
+                                                     df_big_mac, df_costos))
+
+
+def integrar_con_pushdown(cliente, df_envejecimiento, df_poblacion):
+    df_envejecimiento, df_poblacion = si.preparar_relacionales(df_envejecimiento.copy(), df_poblacion.copy())
+    df_documental = si.preparar_documental(si.extraer_documental_pushdown(cliente))
+    return si.integrar_datos_documental(df_envejecimiento, df_poblacion, df_documental)
+
+
+def test_pushdown_integra_igual_que_la_extraccion_completa(cliente, relacionales):
+    esperado = integrar_sin_pushdown(cliente, *relacionales)
+    obtenido = integrar_con_pushdown(cliente, *relacionales)
+
+    pd.testing.assert_frame_equal(obtenido, esperado)
+    assert len(obtenido) == 7
+
+
+def test_pushdown_trae_cada_documento_de_big_mac_una_sola_vez(cliente):
+    df_documental = si.extraer_documental_pushdown(cliente)
+
+    assert len(df_documental) == 7
+    assert sorted(df_documental['big_mac_pais'].dropna()) == ['Albania', 'Andorra', 'Chile', 'Estados Unidos',
+                                                               'Portugal']
+    assert 'costos' not in df_documental.columns
+    assert 'hospedaje_precio_bajo_usd' in df_documental.columns
+
+
+def test_pushdown_no_deja_colecciones_temporales(cliente):
+    si.extraer_documental_pushdown(cliente)
+
+    assert sorted(cliente[si.MONGO_DB].list_collection_names()) == ['big_mac_index', 'costos_turisticos']
+
+
+def etapas(pipeline):
+    for etapa in pipeline:
+        yield etapa
+        for operador in ('$lookup', '$unionWith'):
+            if operador in etapa:
+                yield from etapas(etapa[operador].get('pipeline', []))
+
+
+def test_la_agregacion_no_escribe_en_la_base():
+    assert not any('$out' in etapa or '$merge' in etapa for etapa in etapas(si.pipeline_documental()))